@@ -0,0 +1,55 @@
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from blocktype import BlockType, block_to_block_type, markdown_to_blocks
+from corpus import mixed_document
+
+
+def legacy_block_to_block_type(block):
+    # The regex-per-check classifier that block_to_block_type replaced, kept for comparison
+    if re.match(r"^#{1,6} .+", block):
+        return BlockType.HEADING
+    if block.startswith("```") and block.endswith("```"):
+        return BlockType.CODE
+    if all(line.startswith(">") for line in block.splitlines()):
+        return BlockType.QUOTE
+    if all(line.startswith("- ") for line in block.splitlines()):
+        return BlockType.UNORDERED_LIST
+
+    lines = block.splitlines()
+    if all(re.match(r"^[1-9][0-9]*\. .+", line) for line in lines):
+        numbers = [int(re.match(r"^([1-9][0-9]*)\. .+", line).group(1)) for line in lines]
+        if numbers == list(range(1, len(numbers) + 1)):
+            return BlockType.ORDERED_LIST
+
+    return BlockType.PARAGRAPH
+
+
+def bench(func, blocks, repeat=5):
+    def run():
+        for block in blocks:
+            func(block)
+    number = 1
+    while timeit.timeit(run, number=number) < 0.2:
+        number *= 2
+    return min(timeit.repeat(run, number=number, repeat=repeat)) / number
+
+
+def main():
+    print(f"{'blocks':>7} {'MB':>6} {'legacy ms':>10} {'dispatch ms':>12} {'speedup':>8}")
+    for block_count in (1000, 10000, 50000):
+        markdown = mixed_document(block_count)
+        blocks = markdown_to_blocks(markdown)
+        assert [legacy_block_to_block_type(b) for b in blocks] == [block_to_block_type(b) for b in blocks]
+        legacy = bench(legacy_block_to_block_type, blocks)
+        current = bench(block_to_block_type, blocks)
+        size_mb = len(markdown.encode("utf-8")) / 1e6
+        print(f"{block_count:>7} {size_mb:>6.2f} {legacy * 1000:>10.2f} {current * 1000:>12.2f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
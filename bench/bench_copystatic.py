@@ -0,0 +1,53 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from copystatic import copy_files_recursive
+
+
+def make_tree(root, file_count, file_size, files_per_dir=100):
+    payload = os.urandom(file_size)
+    for i in range(file_count):
+        dir_path = os.path.join(root, f"dir{i // files_per_dir}")
+        if i % files_per_dir == 0:
+            os.makedirs(dir_path)
+        with open(os.path.join(dir_path, f"file{i}.bin"), "wb") as f:
+            f.write(payload)
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare static copy strategies on many small files.")
+    parser.add_argument("--files", type=int, default=10000)
+    parser.add_argument("--size", type=int, default=4096, help="bytes per file")
+    parser.add_argument("--dir", help="scratch directory, e.g. on a network filesystem (default: system temp)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+        source = os.path.join(tmp, "static")
+        make_tree(source, args.files, args.size)
+
+        copytree = timed(lambda: shutil.copytree(source, os.path.join(tmp, "copytree")))
+        serial = timed(lambda: copy_files_recursive(source, os.path.join(tmp, "serial"), max_workers=1))
+        cold = timed(lambda: copy_files_recursive(source, os.path.join(tmp, "sync")))
+        warm = timed(lambda: copy_files_recursive(source, os.path.join(tmp, "sync")))
+
+    print(f"{args.files} files x {args.size} bytes")
+    print(f"  shutil.copytree          {copytree:8.3f}s")
+    print(f"  sync, 1 thread           {serial:8.3f}s  ({copytree / serial:.1f}x)")
+    print(f"  sync, empty output       {cold:8.3f}s  ({copytree / cold:.1f}x)")
+    print(f"  sync, nothing changed    {warm:8.3f}s  ({copytree / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import timeit
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import blocktype
+from blocktype import markdown_to_html_node
+from corpus import link_dense_pages, mixed_document
+from htmlnode import LeafNode, resolve_url
+from textnode import TextNode, TextType
+
+
+# text_node_to_html_node as it was before escaping: values stored verbatim
+def legacy_text_node_to_html_node(text_node, basepath="/"):
+    if not isinstance(text_node, TextNode):
+        raise ValueError("Input must be an instance of TextNode")
+    if text_node.text_type == TextType.TEXT:
+        return LeafNode(tag=None, value=text_node.text)
+    elif text_node.text_type == TextType.BOLD:
+        return LeafNode(tag="b", value=text_node.text)
+    elif text_node.text_type == TextType.ITALIC:
+        return LeafNode(tag="i", value=text_node.text)
+    elif text_node.text_type == TextType.CODE:
+        return LeafNode(tag="code", value=text_node.text)
+    elif text_node.text_type == TextType.LINK:
+        if not text_node.url:
+            raise ValueError("TextNode of type LINK must have a URL")
+        return LeafNode(tag="a", value=text_node.text, props={"href": resolve_url(text_node.url, basepath)})
+    elif text_node.text_type == TextType.IMAGE:
+        if not text_node.url:
+            raise ValueError("TextNode of type IMAGE must have a URL for 'src'")
+        return LeafNode(tag="img", value="", props={"src": resolve_url(text_node.url, basepath), "alt": text_node.text})
+    else:
+        raise ValueError(f"Unsupported TextType: {text_node.text_type}")
+
+
+def text_heavy_document(block_count):
+    # Mostly prose with an occasional character that needs escaping
+    paragraphs = []
+    for i in range(block_count):
+        if i % 10 == 0:
+            paragraphs.append(f"Paragraph {i} compares a < b && b > c in plain prose.")
+        else:
+            paragraphs.append(f"Paragraph {i} is ordinary prose with a **bold** word and an _italic_ one. " * 4)
+    return "\n\n".join(paragraphs)
+
+
+def build_html(markdown):
+    # Escaping now happens while leaves are built, so time parsing and rendering together
+    return markdown_to_html_node(markdown).to_html()
+
+
+def main():
+    documents = [
+        ("text heavy", text_heavy_document(20000)),
+        ("mixed", mixed_document(20000)),
+        ("link dense", "\n\n".join(link_dense_pages(scale=0.05))),
+    ]
+    print(f"{'document':<12} {'legacy ms':>10} {'escaped ms':>11} {'ratio':>6}")
+    for label, markdown in documents:
+        # Interleave the runs so machine noise hits both sides alike
+        legacy_times, current_times = [], []
+        for _ in range(11):
+            with mock.patch.object(blocktype, "text_node_to_html_node", legacy_text_node_to_html_node):
+                legacy_times.append(timeit.timeit(lambda: build_html(markdown), number=1))
+            current_times.append(timeit.timeit(lambda: build_html(markdown), number=1))
+        legacy_seconds, current_seconds = min(legacy_times), min(current_times)
+        print(f"{label:<12} {legacy_seconds * 1000:>10.1f} {current_seconds * 1000:>11.1f} "
+              f"{current_seconds / legacy_seconds:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from corpus import mixed_document
+
+
+def make_source(path, megabytes):
+    chunk = mixed_document(2000)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# Reference\n\n")
+        written = 0
+        while written < megabytes * 1024 * 1024:
+            f.write(chunk)
+            f.write("\n\n")
+            written += len(chunk) + 2
+
+
+def run_child(source, template, dest, threshold):
+    # Peak RSS is per process, so each mode gets a fresh interpreter
+    code = (
+        "import resource, sys, time\n"
+        f"sys.path.insert(0, {SRC!r})\n"
+        "from gencontent import generate_page\n"
+        "start = time.perf_counter()\n"
+        f"generate_page({source!r}, {template!r}, {dest!r}, '/', mmap_threshold={threshold})\n"
+        "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    return run_code(code)
+
+
+def run_build_child(content, template, public, threshold):
+    # The whole incremental build path: planning, source hashing, generation
+    # and the manifest, not just generate_page
+    code = (
+        "import contextlib, io, resource, sys, time\n"
+        f"sys.path.insert(0, {SRC!r})\n"
+        "from gencontent import generate_pages_incremental\n"
+        "start = time.perf_counter()\n"
+        "with contextlib.redirect_stdout(io.StringIO()):\n"
+        f"    generate_pages_incremental({content!r}, {template!r}, {public!r}, '/', mmap_threshold={threshold})\n"
+        "print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    return run_code(code)
+
+
+def run_code(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    seconds, max_rss_kb = output.split()
+    return float(seconds), int(max_rss_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of reading a large page whole vs memory-mapped.")
+    parser.add_argument("--size", type=int, default=100, help="source size in MB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        os.makedirs(content)
+        source = os.path.join(content, "reference.md")
+        template = os.path.join(tmp, "template.html")
+        make_source(source, args.size)
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title><article>{{ Content }}</article>")
+
+        rows = [
+            ("read whole file", run_child(source, template, os.path.join(tmp, "whole.html"), 1 << 62)),
+            ("memory-mapped", run_child(source, template, os.path.join(tmp, "mapped.html"), 0)),
+            ("build (mapped)", run_build_child(content, template, os.path.join(tmp, "public"), 0)),
+        ]
+        with open(os.path.join(tmp, "whole.html"), "rb") as whole, open(os.path.join(tmp, "mapped.html"), "rb") as mapped:
+            assert whole.read() == mapped.read(), "outputs differ"
+
+    print(f"{args.size} MB source")
+    print(f"  {'mode':<16} {'seconds':>8} {'peak RSS MB':>12}")
+    for label, (seconds, max_rss) in rows:
+        print(f"  {label:<16} {seconds:>8.2f} {max_rss:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import gc
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from blocktype import markdown_to_html_node
+from corpus import mixed_document
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode
+
+
+# Plain-class copies of the node types as they were before __slots__, kept for comparison
+class LegacyTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class LegacyHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class LegacyLeafNode(LegacyHTMLNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+
+class LegacyParentNode(LegacyHTMLNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+def copy_tree(node, leaf_cls, parent_cls):
+    if isinstance(node, LeafNode):
+        return leaf_cls(node.tag, node.value, node.props)
+    return parent_cls(node.tag, [copy_tree(child, leaf_cls, parent_cls) for child in node.children], node.props)
+
+
+def leaf_fields(node):
+    if isinstance(node, LeafNode):
+        yield node.value, node.tag, node.props
+    else:
+        for child in node.children:
+            yield from leaf_fields(child)
+
+
+def measure(build):
+    # Strings and props are shared with the source tree, so only node objects
+    # and child lists are counted.
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    seconds = min(timeit.repeat(build, number=1, repeat=7))
+    del result
+    return size, seconds
+
+
+def main():
+    tree = markdown_to_html_node(mixed_document(20000))
+    fields = list(leaf_fields(tree))
+    html_node_count = sum(1 for _ in iter_nodes(tree))
+
+    rows = [
+        ("HTML nodes (dict)", html_node_count, lambda: copy_tree(tree, LegacyLeafNode, LegacyParentNode)),
+        ("HTML nodes (slots)", html_node_count, lambda: copy_tree(tree, LeafNode, ParentNode)),
+        ("TextNodes (dict)", len(fields), lambda: [LegacyTextNode(v, t, p) for v, t, p in fields]),
+        ("TextNodes (slots)", len(fields), lambda: [TextNode(v, t, p) for v, t, p in fields]),
+    ]
+    print(f"{'':<20} {'nodes':>8} {'bytes/node':>11} {'build ms':>9}")
+    for label, count, build in rows:
+        size, seconds = measure(build)
+        print(f"{label:<20} {count:>8} {size / count:>11.1f} {seconds * 1000:>9.1f}")
+
+
+def iter_nodes(node):
+    yield node
+    for child in node.children or ():
+        yield from iter_nodes(child)
+
+
+if __name__ == "__main__":
+    main()
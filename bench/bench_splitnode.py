@@ -0,0 +1,87 @@
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from htmlnode import text_to_textnodes
+from splitnode import extract_markdown_images, extract_markdown_links
+from textnode import TextNode, TextType
+
+
+# The chained pipeline text_to_textnodes ran before split_nodes_inline, with the
+# str.split based splitters, kept for comparison
+def legacy_split_nodes_delimiter(old_nodes, delimiter, text_type):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        sections = old_node.text.split(delimiter)
+        if len(sections) % 2 == 0:
+            raise ValueError("invalid markdown, formatted section not closed")
+        for i, section in enumerate(sections):
+            if section == "":
+                continue
+            new_nodes.append(TextNode(section, TextType.TEXT if i % 2 == 0 else text_type))
+    return new_nodes
+
+
+def legacy_split_nodes_pattern(old_nodes, extract, markup, text_type):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        original_text = old_node.text
+        matches = extract(original_text)
+        if len(matches) == 0:
+            new_nodes.append(old_node)
+            continue
+        for text, url in matches:
+            sections = original_text.split(markup.format(text, url), 1)
+            if sections[0] != "":
+                new_nodes.append(TextNode(sections[0], TextType.TEXT))
+            new_nodes.append(TextNode(text, text_type, url))
+            original_text = sections[1]
+        if original_text != "":
+            new_nodes.append(TextNode(original_text, TextType.TEXT))
+    return new_nodes
+
+
+def legacy_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = legacy_split_nodes_pattern(nodes, extract_markdown_images, "![{}]({})", TextType.IMAGE)
+    nodes = legacy_split_nodes_pattern(nodes, extract_markdown_links, "[{}]({})", TextType.LINK)
+    nodes = legacy_split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = legacy_split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = legacy_split_nodes_delimiter(nodes, "`", TextType.CODE)
+    return nodes
+
+
+def link_dense_paragraph(link_count):
+    return " ".join(
+        f"see [reference number {i}](https://example.com/docs/{i}) and ![figure {i}](/images/{i}.png) for **details**"
+        for i in range(link_count)
+    )
+
+
+def bench(func, text, repeat=5):
+    number = 1
+    while timeit.timeit(lambda: func(text), number=number) < 0.2:
+        number *= 2
+    return min(timeit.repeat(lambda: func(text), number=number, repeat=repeat)) / number
+
+
+def main():
+    print(f"{'links':>7} {'legacy ms':>10} {'current ms':>11} {'speedup':>8}")
+    for link_count in (10, 100, 1000, 5000):
+        text = link_dense_paragraph(link_count)
+        assert legacy_text_to_textnodes(text) == text_to_textnodes(text)
+        legacy = bench(legacy_text_to_textnodes, text)
+        current = bench(text_to_textnodes, text)
+        print(f"{link_count:>7} {legacy * 1000:>10.3f} {current * 1000:>11.3f} {legacy / current:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import random
+
+
+def mixed_document(block_count, seed=0):
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(block_count):
+        kind = rng.choice(("heading", "paragraph", "paragraph", "quote", "ulist", "olist", "code"))
+        if kind == "heading":
+            blocks.append(f"{'#' * rng.randint(1, 6)} Heading {i}")
+        elif kind == "paragraph":
+            blocks.append("\n".join(f"Line {j} of a **paragraph** with _text_." for j in range(rng.randint(1, 6))))
+        elif kind == "quote":
+            blocks.append("\n".join(f"> quoted line {j}" for j in range(rng.randint(1, 6))))
+        elif kind == "ulist":
+            blocks.append("\n".join(f"- item {j}" for j in range(rng.randint(1, 20))))
+        elif kind == "olist":
+            blocks.append("\n".join(f"{j}. item {j}" for j in range(1, rng.randint(2, 20))))
+        else:
+            blocks.append("```\n" + "\n".join(f"print({j})" for j in range(rng.randint(1, 10))) + "\n```")
+    return "\n\n".join(blocks)
+
+
+def page(title, body):
+    return f"# {title}\n\n{body}\n"
+
+
+def scaled(count, scale):
+    return max(1, int(count * scale))
+
+
+def small_pages(scale=1.0, seed=0):
+    return [page(f"Small page {i}", mixed_document(12, seed + i)) for i in range(scaled(2000, scale))]
+
+
+def huge_pages(scale=1.0, seed=0):
+    return [page(f"Huge page {i}", mixed_document(scaled(20000, scale), seed + i)) for i in range(3)]
+
+
+def link_dense_pages(scale=1.0, links_per_paragraph=50):
+    paragraph = " ".join(
+        f"see [reference {i}](/docs/{i}) and ![figure {i}](/images/{i}.png)"
+        for i in range(links_per_paragraph)
+    )
+    return [page(f"Links {i}", "\n\n".join([paragraph] * 20)) for i in range(scaled(200, scale))]
+
+
+def nested_list_pages(scale=1.0, depth=8, width=5):
+    def nested(level):
+        lines = []
+        for i in range(width):
+            lines.append(f"{'  ' * level}- level {level} item {i} with `code`")
+            if level + 1 < depth and i == 0:
+                lines.extend(nested(level + 1))
+        return lines
+
+    body = "\n".join(nested(0))
+    return [page(f"Nested {i}", "\n\n".join([body] * 10)) for i in range(scaled(200, scale))]
+
+
+def code_heavy_pages(scale=1.0, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for i in range(scaled(200, scale)):
+        blocks = []
+        for j in range(30):
+            code = "\n".join(f"    value_{k} = compute({k}, '**not bold**')" for k in range(rng.randint(5, 40)))
+            blocks.append(f"Example {j} uses `compute`:")
+            blocks.append(f"```\n{code}\n```")
+        pages.append(page(f"Code {i}", "\n\n".join(blocks)))
+    return pages
+
+
+CORPORA = {
+    "small_pages": small_pages,
+    "huge_pages": huge_pages,
+    "link_dense": link_dense_pages,
+    "nested_lists": nested_list_pages,
+    "code_heavy": code_heavy_pages,
+}
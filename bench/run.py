@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+import blocktype
+from blocktype import block_to_block_type, markdown_to_blocks, markdown_to_html_node
+from corpus import CORPORA
+from document import block_title
+from gencontent import write_page
+from htmlnode import text_to_textnodes
+from template import load_template
+
+STAGES = ("markdown_to_blocks", "block_to_block_type", "text_to_textnodes", "markdown_to_html_node", "to_html", "page_write")
+
+
+def record_inline_inputs(pages):
+    # Capture exactly what the block handlers pass to the inline tokenizer
+    inputs = []
+
+    def spy(text):
+        inputs.append(text)
+        return text_to_textnodes(text)
+
+    original = blocktype.text_to_textnodes
+    blocktype.text_to_textnodes = spy
+    try:
+        for markdown in pages:
+            markdown_to_html_node(markdown)
+    finally:
+        blocktype.text_to_textnodes = original
+    return inputs
+
+
+def page_title(markdown):
+    for block in markdown_to_blocks(markdown):
+        title = block_title(block, block_to_block_type(block))
+        if title is not None:
+            return title
+    raise ValueError("No H1 header found in the markdown text.")
+
+
+def time_stages(pages, template, out_dir):
+    timings = {}
+
+    start = time.perf_counter()
+    page_blocks = [markdown_to_blocks(markdown) for markdown in pages]
+    timings["markdown_to_blocks"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for blocks in page_blocks:
+        for block in blocks:
+            block_to_block_type(block)
+    timings["block_to_block_type"] = time.perf_counter() - start
+
+    inline_inputs = record_inline_inputs(pages)
+    start = time.perf_counter()
+    for text in inline_inputs:
+        text_to_textnodes(text)
+    timings["text_to_textnodes"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    nodes = [markdown_to_html_node(markdown) for markdown in pages]
+    timings["markdown_to_html_node"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for node in nodes:
+        node.to_html()
+    timings["to_html"] = time.perf_counter() - start
+
+    titles = [page_title(markdown) for markdown in pages]
+    # Time a first build's writes, not the compare-only path taken when the
+    # previous repetition's output is already there
+    for filename in os.listdir(out_dir):
+        os.remove(os.path.join(out_dir, filename))
+    start = time.perf_counter()
+    # The build's write path: the template and the node tree are rendered
+    # straight into the output file
+    for i, (title, node) in enumerate(zip(titles, nodes)):
+        write_page(os.path.join(out_dir, f"page{i}.html"), template, title, node.render_to)
+    timings["page_write"] = time.perf_counter() - start
+
+    return timings
+
+
+def run_corpus(name, scale, repeat):
+    pages = CORPORA[name](scale)
+    source_bytes = sum(len(markdown.encode("utf-8")) for markdown in pages)
+    template = load_template(os.path.join(ROOT, "template.html"))
+
+    best = {}
+    with tempfile.TemporaryDirectory() as out_dir:
+        for _ in range(repeat):
+            for stage, seconds in time_stages(pages, template, out_dir).items():
+                best[stage] = min(seconds, best.get(stage, seconds))
+
+    return {
+        "pages": len(pages),
+        "bytes": source_bytes,
+        "stages": {
+            stage: {
+                "seconds": seconds,
+                "pages_per_s": len(pages) / seconds if seconds else None,
+                "mb_per_s": source_bytes / 1e6 / seconds if seconds else None,
+            }
+            for stage, seconds in best.items()
+        },
+    }
+
+
+def print_results(results, baseline=None):
+    for name, result in results.items():
+        print(f"\n{name}: {result['pages']} pages, {result['bytes'] / 1e6:.2f} MB")
+        header = f"  {'stage':<22} {'ms':>9} {'pages/s':>10} {'MB/s':>8}"
+        if baseline:
+            header += f" {'vs base':>8}"
+        print(header)
+        for stage in STAGES:
+            timing = result["stages"][stage]
+            line = f"  {stage:<22} {timing['seconds'] * 1000:>9.1f} {timing['pages_per_s']:>10.0f} {timing['mb_per_s']:>8.1f}"
+            base = (baseline or {}).get(name, {}).get("stages", {}).get(stage)
+            if base:
+                # > 1.00x means this run is faster than the baseline
+                line += f" {base['seconds'] / timing['seconds']:>7.2f}x"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parse -> render -> write pipeline.")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA),
+                        help="corpus to run (repeatable, default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes by this factor")
+    parser.add_argument("--repeat", type=int, default=3, help="keep the best of this many runs")
+    parser.add_argument("--output", help="save results as JSON to this path")
+    parser.add_argument("--compare", help="JSON results from an earlier run to compare against")
+    args = parser.parse_args()
+
+    results = {name: run_corpus(name, args.scale, args.repeat) for name in args.corpus or CORPORA}
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print_results(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "scale": args.scale,
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
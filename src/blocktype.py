@@ -1,4 +1,4 @@
-from htmlnode import ParentNode, text_to_textnodes, text_node_to_html_node, TextNode, TextType
+from htmlnode import ParentNode, RawNode, text_to_textnodes, text_node_to_html_node, TextNode, TextType
 from enum import Enum
 import re
 
@@ -11,79 +11,170 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
-def block_to_block_type(block):
-    if re.match(r"^#{1,6} .+", block):
+_heading_pattern = re.compile(r"#{1,6} .+")
+_ordered_item_pattern = re.compile(r"([1-9][0-9]*)\. .+")
+
+
+def _classify_heading(block):
+    if _heading_pattern.match(block):
         return BlockType.HEADING
+    return BlockType.PARAGRAPH
+
+
+def _classify_code(block):
     if block.startswith("```") and block.endswith("```"):
         return BlockType.CODE
+    return BlockType.PARAGRAPH
+
+
+def _classify_quote(block):
     if all(line.startswith(">") for line in block.splitlines()):
         return BlockType.QUOTE
-    if all(line.startswith("- ") for line in block.splitlines()):
-        return BlockType.UNORDERED_LIST
+    return BlockType.PARAGRAPH
 
-    lines = block.splitlines()
-    if all(re.match(r"^[1-9][0-9]*\. .+", line) for line in lines):
-        numbers = [int(re.match(r"^([1-9][0-9]*)\. .+", line).group(1)) for line in lines]
-        if numbers == list(range(1, len(numbers) + 1)):
-            return BlockType.ORDERED_LIST
 
+def _classify_unordered_list(block):
+    if all(line.startswith("- ") for line in block.splitlines()):
+        return BlockType.UNORDERED_LIST
     return BlockType.PARAGRAPH
 
-def markdown_to_blocks(markdown):
 
-    # Split the Markdown string into "blocks" using double newlines
-    blocks = markdown.split('\n\n')
+def _classify_ordered_list(block):
+    # One match per line both validates the item and yields its number
+    for expected, line in enumerate(block.splitlines(), 1):
+        match = _ordered_item_pattern.match(line)
+        if match is None or int(match.group(1)) != expected:
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
 
-    # Strip whitespace and remove empty blocks
-    cleaned_blocks = [block.strip() for block in blocks if block.strip()]
-    cleaned_blocks = [re.sub(r'\n\s+', '\n', block) for block in cleaned_blocks]
 
-    return cleaned_blocks
+# Every block type is recognisable from its first character, so only one
+# check ever runs per block.
+_block_classifiers = {
+    "#": _classify_heading,
+    "`": _classify_code,
+    ">": _classify_quote,
+    "-": _classify_unordered_list,
+    **{digit: _classify_ordered_list for digit in "123456789"},
+}
 
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
-    return ParentNode("div", children, None)
+def block_to_block_type(block):
+    classify = _block_classifiers.get(block[:1])
+    if classify is None:
+        return BlockType.PARAGRAPH
+    return classify(block)
+
+_indented_line_pattern = re.compile(r'\n\s+')
+
+
+def _iter_raw_blocks(source):
+    if isinstance(source, str):
+        # Same chunks as source.split("\n\n"), produced one at a time
+        start = 0
+        while True:
+            end = source.find("\n\n", start)
+            if end == -1:
+                yield source[start:]
+                return
+            yield source[start:end]
+            start = end + 2
+    else:
+        # Any iterable of lines, e.g. an open file: a bare newline ends the block
+        lines = []
+        for line in source:
+            if line == "\n":
+                yield "".join(lines)
+                lines = []
+            else:
+                lines.append(line)
+        yield "".join(lines)
+
+
+def iter_blocks(source):
+    # Lazily yield cleaned blocks from a markdown string or file handle
+    for raw_block in _iter_raw_blocks(source):
+        block = raw_block.strip()
+        if not block:
+            continue
+        if "\n" in block:
+            block = _indented_line_pattern.sub("\n", block)
+        yield block
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def markdown_to_blocks(markdown):
+    return list(iter_blocks(markdown))
+
+
+def iter_html_nodes(source, cache=None, basepath="/"):
+    # One HTML node per block, so large documents can be rendered block by block
+    for block in iter_blocks(source):
+        yield block_to_html_node(block, cache, basepath=basepath)
+
+
+def markdown_to_html_node(markdown, cache=None, basepath="/"):
+    return ParentNode("div", list(iter_html_nodes(markdown, cache, basepath)), None)
+
+
+def block_to_html_node(block, cache=None, block_type=None, basepath="/", links=None, plain_text=None):
+    # cache maps (basepath, block text) to the block's rendered RawNode, e.g.
+    # a dict or a rendercache.RenderCache. Link URLs depend on basepath, so it
+    # is part of the key. Link and image targets, as written
+    # in the source, are appended to links when it is a list, and the text of
+    # each paragraph, heading, list item or quote to plain_text.
+    if cache is not None:
+        key = (basepath, block)
+        node = cache.get(key)
+        if node is None:
+            block_links = []
+            block_text = []
+            tree = block_to_html_node(block, None, block_type, basepath, block_links, block_text)
+            node = RawNode(tree.to_html(), block_links, block_text)
+            cache[key] = node
+        if links is not None:
+            links.extend(node.links)
+        if plain_text is not None:
+            plain_text.extend(node.text)
+        return node
+
+    if block_type is None:
+        block_type = block_to_block_type(block)
     if block_type == BlockType.PARAGRAPH:
-        return paragraph_to_html_node(block)
+        return paragraph_to_html_node(block, basepath, links, plain_text)
     if block_type == BlockType.HEADING:
-        return heading_to_html_node(block)
+        return heading_to_html_node(block, basepath, links, plain_text)
     if block_type == BlockType.CODE:
         return code_to_html_node(block)
     if block_type == BlockType.ORDERED_LIST:
-        return olist_to_html_node(block)
+        return olist_to_html_node(block, basepath, links, plain_text)
     if block_type == BlockType.UNORDERED_LIST:
-        return ulist_to_html_node(block)
+        return ulist_to_html_node(block, basepath, links, plain_text)
     if block_type == BlockType.QUOTE:
-        return quote_to_html_node(block)
+        return quote_to_html_node(block, basepath, links, plain_text)
     raise ValueError("invalid block type")
 
 
-def text_to_children(text):
+def text_to_children(text, basepath="/", links=None, plain_text=None):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, basepath)
         children.append(html_node)
+        if links is not None and text_node.url is not None:
+            links.append(text_node.url)
+    if plain_text is not None:
+        plain_text.append("".join([text_node.text for text_node in text_nodes]))
     return children
 
 
-def paragraph_to_html_node(block):
+def paragraph_to_html_node(block, basepath="/", links=None, plain_text=None):
     lines = block.split("\n")
     paragraph = " ".join(lines)
-    children = text_to_children(paragraph)
+    children = text_to_children(paragraph, basepath, links, plain_text)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
+def heading_to_html_node(block, basepath="/", links=None, plain_text=None):
     level = 0
     for char in block:
         if char == "#":
@@ -93,7 +184,7 @@ def heading_to_html_node(block):
     if level + 1 >= len(block):
         raise ValueError(f"invalid heading level: {level}")
     text = block[level + 1 :]
-    children = text_to_children(text)
+    children = text_to_children(text, basepath, links, plain_text)
     return ParentNode(f"h{level}", children)
 
 
@@ -107,27 +198,27 @@ def code_to_html_node(block):
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
+def olist_to_html_node(block, basepath="/", links=None, plain_text=None):
     items = block.split("\n")
     html_items = []
     for item in items:
         text = item[3:]
-        children = text_to_children(text)
+        children = text_to_children(text, basepath, links, plain_text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
+def ulist_to_html_node(block, basepath="/", links=None, plain_text=None):
     items = block.split("\n")
     html_items = []
     for item in items:
         text = item[2:]
-        children = text_to_children(text)
+        children = text_to_children(text, basepath, links, plain_text)
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
+def quote_to_html_node(block, basepath="/", links=None, plain_text=None):
     lines = block.split("\n")
     new_lines = []
     for line in lines:
@@ -135,5 +226,5 @@ def quote_to_html_node(block):
             raise ValueError("invalid quote block")
         new_lines.append(line.lstrip(">").strip())
     content = " ".join(new_lines)
-    children = text_to_children(content)
+    children = text_to_children(content, basepath, links, plain_text)
     return ParentNode("blockquote", children)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import sys
+import time
+
+QUIET = 0
+SUMMARY = 1
+VERBOSE = 2
+
+
+class BuildLog:
+    # Leveled build output. Verbose lines are buffered and written in batches
+    # so per-page messages don't cost a synchronous write each; the progress
+    # counter only redraws on a terminal and at most every progress_interval.
+
+    def __init__(self, level=SUMMARY, stream=None, buffer_lines=256, progress_interval=0.1):
+        self.level = level
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self.progress_interval = progress_interval
+        self._buffer = []
+        self._last_progress = 0.0
+
+    def _stream(self):
+        # Resolved late so redirected stdout (tests, workers) is honoured
+        return self.stream or sys.stdout
+
+    def verbose(self, message):
+        if self.level >= VERBOSE:
+            self._buffer.append(message + "\n")
+            if len(self._buffer) >= self.buffer_lines:
+                self.flush()
+
+    def info(self, message):
+        if self.level >= SUMMARY:
+            self._buffer.append(message + "\n")
+            self.flush()
+
+    def error(self, message):
+        self.flush()
+        sys.stderr.write(message + "\n")
+        sys.stderr.flush()
+
+    def progress(self, done, total, done_bytes=None, total_bytes=None):
+        if self.level != SUMMARY:
+            return
+        stream = self._stream()
+        if not stream.isatty():
+            return
+        now = time.monotonic()
+        if done < total and now - self._last_progress < self.progress_interval:
+            return
+        self._last_progress = now
+        line = f"\r{done}/{total} pages"
+        if total_bytes:
+            # Pages vary a lot in size, so source bytes are the better measure of progress
+            line += f" ({done_bytes / 1e6:.1f}/{total_bytes / 1e6:.1f} MB)"
+        stream.write(line)
+        if done >= total:
+            stream.write("\n")
+        stream.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        stream = self._stream()
+        stream.write("".join(self._buffer))
+        stream.flush()
+        self._buffer = []
+
+
+log = BuildLog()
+
+
+def set_level(level):
+    # Also used as the process pool initializer so workers share the parent's level
+    log.level = level
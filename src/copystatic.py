@@ -1,15 +1,127 @@
 import os
 import shutil
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from manifest import STATIC_MANIFEST_FILENAME, hash_file, load_manifest, save_manifest
 
-def copy_files_recursive(source_dir_path, dest_dir_path):
-    if not os.path.exists(dest_dir_path):
-        os.mkdir(dest_dir_path)
-
-    for filename in os.listdir(source_dir_path):
-        from_path = os.path.join(source_dir_path, filename)
-        to_path = os.path.join(dest_dir_path, filename)
-        print(f" * {from_path} -> {to_path}")
-        if os.path.isfile(from_path):
-            shutil.copy(from_path, to_path)
-        else:
-            copy_files_recursive(from_path, to_path)
\ No newline at end of file
+
+def remove_empty_dirs(dir_path, stop_dir_path):
+    stop_dir_path = os.path.abspath(stop_dir_path)
+    dir_path = os.path.abspath(dir_path)
+    while dir_path != stop_dir_path and dir_path.startswith(stop_dir_path + os.sep):
+        try:
+            os.rmdir(dir_path)
+        except OSError:
+            return
+        dir_path = os.path.dirname(dir_path)
+
+
+def is_unchanged(from_path, to_path, from_stat, use_hash=False):
+    try:
+        to_stat = os.stat(to_path)
+    except FileNotFoundError:
+        return False
+    if from_stat.st_size != to_stat.st_size:
+        return False
+    # Copies keep the source mtime, so equal size and mtime means an earlier sync
+    if from_stat.st_mtime_ns == to_stat.st_mtime_ns:
+        return True
+    if use_hash and hash_file(from_path) == hash_file(to_path):
+        # Same bytes, just touched: refresh the mtime instead of copying
+        shutil.copystat(from_path, to_path)
+        return True
+    return False
+
+
+def copy_file(from_path, to_path, link=False):
+    if link:
+        if os.path.lexists(to_path):
+            os.remove(to_path)
+        try:
+            os.link(from_path, to_path)
+            return
+        except OSError:
+            pass  # e.g. a different filesystem; fall back to copying
+
+    # Copy into a temporary file and rename it over to_path. Opening to_path
+    # itself for writing would truncate the source when to_path is a hardlink
+    # of it, e.g. left by an earlier link=True sync.
+    to_dir_path, to_name = os.path.split(to_path)
+    tmp_path = os.path.join(to_dir_path, f".{to_name}.tmp")
+    try:
+        copied = False
+        if hasattr(os, "copy_file_range"):
+            # Lets the kernel share extents (reflink) or copy in-kernel where supported
+            try:
+                with open(from_path, "rb") as src, open(tmp_path, "wb") as dst:
+                    remaining = os.fstat(src.fileno()).st_size
+                    while remaining > 0:
+                        written = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                        if written == 0:
+                            break
+                        remaining -= written
+                copied = remaining == 0
+            except OSError:
+                copied = False
+        if not copied:
+            shutil.copyfile(from_path, tmp_path)
+        shutil.copystat(from_path, tmp_path)
+        os.replace(tmp_path, to_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+SyncResult = namedtuple("SyncResult", ["files", "copied", "removed", "bytes_copied", "seconds"])
+
+
+def scan_files(dir_path, rel_dir_path=""):
+    # Yield (relative path, DirEntry) for every file; DirEntry caches its stat
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            rel_path = os.path.join(rel_dir_path, entry.name) if rel_dir_path else entry.name
+            if entry.is_dir():
+                yield from scan_files(entry.path, rel_path)
+            else:
+                yield rel_path, entry
+
+
+def copy_files_recursive(source_dir_path, dest_dir_path, use_hash=False, link=False, max_workers=None):
+    # Sync source_dir_path into dest_dir_path: copy new and changed files and
+    # remove files this function copied on an earlier run whose source is gone.
+    start = time.perf_counter()
+    previous = load_manifest(dest_dir_path, STATIC_MANIFEST_FILENAME).get("files", [])
+    files = list(scan_files(source_dir_path))
+
+    # Create the directory skeleton up front so the workers only copy
+    for dir_path in sorted({os.path.dirname(rel_path) for rel_path, _ in files}):
+        os.makedirs(os.path.join(dest_dir_path, dir_path), exist_ok=True)
+
+    def sync_file(item):
+        rel_path, entry = item
+        to_path = os.path.join(dest_dir_path, rel_path)
+        from_stat = entry.stat()
+        if is_unchanged(entry.path, to_path, from_stat, use_hash):
+            return None
+        copy_file(entry.path, to_path, link)
+        return from_stat.st_size
+
+    # Copies are I/O bound, so threads overlap the per-file latency
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        copied_sizes = [size for size in executor.map(sync_file, files) if size is not None]
+
+    current = {rel_path for rel_path, _ in files}
+    removed = 0
+    for rel_path in previous:
+        if rel_path in current:
+            continue
+        to_path = os.path.join(dest_dir_path, rel_path)
+        if os.path.exists(to_path):
+            os.remove(to_path)
+            removed += 1
+        remove_empty_dirs(os.path.dirname(to_path), dest_dir_path)
+
+    save_manifest(dest_dir_path, {"files": sorted(current)}, STATIC_MANIFEST_FILENAME)
+    return SyncResult(len(files), len(copied_sizes), removed, sum(copied_sizes), time.perf_counter() - start)
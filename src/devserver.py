@@ -0,0 +1,161 @@
+import functools
+import http.server
+import os
+import threading
+import time
+from buildlog import log
+from copystatic import copy_file, remove_empty_dirs
+from gencontent import content_dest_path, generate_page
+from manifest import STATIC_MANIFEST_FILENAME, hash_file, load_manifest, save_manifest
+
+# Rebuilt pages reuse nodes for unchanged blocks; the cache is dropped
+# wholesale once it grows past this many blocks.
+max_cached_blocks = 100_000
+# Parsed documents are kept the same way, dropped once the sources they were
+# parsed from add up to more than this many bytes
+max_cached_document_bytes = 16 * 1024 * 1024
+
+
+def scan_files(dir_path):
+    snapshot = {}
+    if not os.path.isdir(dir_path):
+        return snapshot
+    for dirpath, _, filenames in os.walk(dir_path):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+class SiteWatcher:
+    def __init__(self, content_dir, static_dir, template_path, public_dir, basepath="/"):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.public_dir = public_dir
+        self.basepath = basepath
+        self.block_cache = {}
+        self.documents = {}
+        self.content = scan_files(content_dir)
+        self.static = scan_files(static_dir)
+        self.template = self.template_stat()
+
+    def template_stat(self):
+        try:
+            stat = os.stat(self.template_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def poll(self):
+        # Compare against the last snapshot and rebuild only what changed.
+        # Returns the output paths that were written or removed.
+        content = scan_files(self.content_dir)
+        static = scan_files(self.static_dir)
+        template = self.template_stat()
+
+        if template != self.template:
+            changed_pages = list(content)
+        else:
+            changed_pages = [path for path, stat in content.items() if self.content.get(path) != stat]
+        removed_pages = [path for path in self.content if path not in content]
+        changed_static = [path for path, stat in static.items() if self.static.get(path) != stat]
+        removed_static = [path for path in self.static if path not in static]
+
+        previous_template = self.template
+        self.content, self.static, self.template = content, static, template
+
+        if len(self.block_cache) > max_cached_blocks:
+            self.block_cache.clear()
+        if sum(size for _, size, _ in self.documents.values()) > max_cached_document_bytes:
+            self.documents.clear()
+
+        touched = []
+        generated = []
+        failed = []
+        for from_path in changed_pages:
+            dest_path = content_dest_path(from_path, self.content_dir, self.public_dir)
+            try:
+                generate_page(from_path, self.template_path, dest_path, self.basepath, self.block_cache,
+                              documents=self.documents)
+            except Exception as e:
+                # Keep watching: the file is probably mid-edit
+                log.error(f"Error generating {from_path}: {e}")
+                failed.append(from_path)
+                continue
+            generated.append((from_path, dest_path))
+            touched.append(dest_path)
+        for from_path in removed_pages:
+            touched.append(self.remove_output(content_dest_path(from_path, self.content_dir, self.public_dir)))
+        for from_path in changed_static:
+            dest_path = os.path.join(self.public_dir, os.path.relpath(from_path, self.static_dir))
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            copy_file(from_path, dest_path)
+            touched.append(dest_path)
+        for from_path in removed_static:
+            touched.append(self.remove_output(os.path.join(self.public_dir, os.path.relpath(from_path, self.static_dir))))
+
+        if changed_pages or removed_pages:
+            self.update_page_manifest(generated, failed + removed_pages, template_changed=template != previous_template)
+        if changed_static or removed_static:
+            self.update_static_manifest(changed_static, removed_static)
+        return touched
+
+    def update_page_manifest(self, generated, forgotten, template_changed):
+        # Keep .manifest.json in step so the next build (and --check-links)
+        # starts from what is actually on disk
+        manifest = load_manifest(self.public_dir)
+        pages = manifest.setdefault("pages", {})
+        if template_changed and self.template is not None:
+            manifest["template"] = hash_file(self.template_path)
+        for from_path, dest_path in generated:
+            mtime, size = self.content[from_path]
+            # Links aren't collected here; a --check-links build regenerates the page
+            pages[from_path] = {"hash": hash_file(from_path), "size": size, "mtime": mtime, "dest": dest_path}
+        for from_path in forgotten:
+            # Failed pages are dropped so the next build retries them
+            pages.pop(from_path, None)
+        save_manifest(self.public_dir, manifest)
+
+    def update_static_manifest(self, changed_static, removed_static):
+        # Static files copied here must be pruned by the next build if their source goes
+        manifest = load_manifest(self.public_dir, STATIC_MANIFEST_FILENAME)
+        files = set(manifest.get("files", []))
+        files.update(os.path.relpath(from_path, self.static_dir) for from_path in changed_static)
+        files.difference_update(os.path.relpath(from_path, self.static_dir) for from_path in removed_static)
+        save_manifest(self.public_dir, {"files": sorted(files)}, STATIC_MANIFEST_FILENAME)
+
+    def remove_output(self, dest_path):
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            log.verbose(f"Removed: {dest_path}")
+        remove_empty_dirs(os.path.dirname(dest_path), self.public_dir)
+        return dest_path
+
+
+def serve(public_dir, port=8888, watcher=None, interval=0.1):
+    handler = functools.partial(http.server.SimpleHTTPRequestHandler, directory=public_dir)
+    server = http.server.ThreadingHTTPServer(("", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    log.info(f"Serving {public_dir} at http://localhost:{server.server_address[1]}/")
+
+    try:
+        while True:
+            time.sleep(interval)
+            if watcher is None:
+                continue
+            start = time.perf_counter()
+            touched = watcher.poll()
+            if touched:
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                log.info(f"Rebuilt {len(touched)} file(s) in {elapsed_ms:.1f} ms")
+    except KeyboardInterrupt:
+        log.info("Stopping server...")
+    finally:
+        server.shutdown()
+        server.server_close()
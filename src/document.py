@@ -0,0 +1,200 @@
+import mmap
+import os
+from blocktype import BlockType, block_to_block_type, block_to_html_node, iter_blocks, markdown_to_blocks
+from htmlnode import ParentNode
+from profiler import no_stage
+
+# Memory-mapped sources give back parsed pages in steps of this many bytes
+release_mapped_bytes = 8 * 1024 * 1024
+_can_release = hasattr(mmap, "MADV_DONTNEED")
+
+
+class Document:
+    # A parsed page: the title from its first H1 block, the rendered node tree,
+    # its distinct link and image targets as written in the source (when
+    # collected), and the plain text of each paragraph, heading, list item
+    # and quote (when collected)
+    __slots__ = ("title", "node", "links", "text")
+
+    def __init__(self, title, node, links=(), text=()):
+        self.title = title
+        self.node = node
+        self.links = links
+        self.text = text
+
+    def render_to(self, write):
+        self.node.render_to(write)
+
+    def __repr__(self):
+        return f"Document({self.title}, {self.node})"
+
+
+class StreamedDocument:
+    # A page parsed one block at a time whenever it is rendered: each block's
+    # nodes are written out and dropped, so no node tree for the whole page is
+    # built. links (with collect_links) and text (with collect_text) are
+    # filled in as the document is rendered.
+
+    def __init__(self, markdown, cache=None, basepath="/", collect_links=False, collect_text=False):
+        self.markdown = markdown
+        self.cache = cache
+        self.basepath = basepath
+        self.collect_links = collect_links
+        self.collect_text = collect_text
+        self.links = ()
+        self.text = ()
+        self.title = self._find_title()
+
+    def iter_blocks(self):
+        return iter_blocks(self.markdown)
+
+    def _find_title(self):
+        # Usually the first block, so this stops long before the end of the file
+        for block in self.iter_blocks():
+            title = block_title(block, block_to_block_type(block))
+            if title is not None:
+                return title
+        raise ValueError("No H1 header found in the markdown text.")
+
+    def render_to(self, write):
+        # Links are deduplicated block by block, so a huge page holds each
+        # target once rather than every occurrence
+        links = {} if self.collect_links else None
+        block_links = [] if self.collect_links else None
+        self.text = [] if self.collect_text else None
+        write("<div>")
+        for block in self.iter_blocks():
+            node = block_to_html_node(block, self.cache, basepath=self.basepath, links=block_links, plain_text=self.text)
+            node.render_to(write)
+            if block_links:
+                links.update(dict.fromkeys(block_links))
+                block_links.clear()
+        write("</div>")
+        self.links = list(links) if links else ()
+        if self.text is None:
+            self.text = ()
+
+    def __repr__(self):
+        return f"StreamedDocument({self.title})"
+
+
+class MappedDocument(StreamedDocument):
+    # A source too large to hold as one string. The file is memory-mapped and
+    # streamed like a StreamedDocument, so memory tracks the largest block
+    # rather than the whole file. Use as a context manager.
+
+    def __init__(self, source_path, cache=None, basepath="/", collect_links=False, collect_text=False):
+        self.source_path = source_path
+        self._mapped = None
+        with open(source_path, "rb") as source_file:
+            # mmap can't map an empty file
+            if os.fstat(source_file.fileno()).st_size:
+                self._mapped = mmap.mmap(source_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mapped is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            # Lets the kernel drop pages that have already been parsed
+            self._mapped.madvise(mmap.MADV_SEQUENTIAL)
+        super().__init__(None, cache, basepath, collect_links, collect_text)
+
+    def iter_blocks(self):
+        if self._mapped is None:
+            return iter(())
+        self._mapped.seek(0)
+        return iter_blocks(_iter_mapped_lines(self._mapped))
+
+    def close(self):
+        if self._mapped is not None:
+            self._mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return f"MappedDocument({self.source_path}, {self.title})"
+
+
+def _iter_mapped_lines(mapped):
+    # Decoded lines with universal newlines, matching a file read in text mode.
+    # Pages behind the read position are released as it advances, since mapped
+    # pages count towards RSS until the kernel reclaims them.
+    released = 0
+    for line in iter(mapped.readline, b""):
+        if _can_release:
+            position = mapped.tell()
+            if position - released >= release_mapped_bytes:
+                end = position - position % mmap.PAGESIZE
+                mapped.madvise(mmap.MADV_DONTNEED, released, end - released)
+                released = end
+        text = line.decode("utf-8")
+        if "\r" not in text:
+            yield text
+            continue
+        pieces = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        for piece in pieces[:-1]:
+            yield piece + "\n"
+        if pieces[-1]:
+            yield pieces[-1]
+
+
+def block_title(block, block_type):
+    # The page title if this block is an H1 heading, else None
+    if block_type == BlockType.HEADING and block.startswith("# "):
+        return block[2:].split("\n", 1)[0].strip()
+    return None
+
+
+def parse_document(markdown, cache=None, basepath="/", stage=no_stage, collect_links=False, collect_text=False):
+    # stage(name) is a context manager wrapped around each parsing step,
+    # e.g. PageProfile.stage
+    with stage("block split"):
+        blocks = markdown_to_blocks(markdown)
+
+    with stage("classify"):
+        block_types = [block_to_block_type(block) for block in blocks]
+        title = None
+        for block, block_type in zip(blocks, block_types):
+            title = block_title(block, block_type)
+            if title is not None:
+                break
+        if title is None:
+            raise ValueError("No H1 header found in the markdown text.")
+
+    with stage("inline parse"):
+        links = [] if collect_links else None
+        text = [] if collect_text else None
+        children = [block_to_html_node(block, cache, block_type, basepath, links, text)
+                    for block, block_type in zip(blocks, block_types)]
+    return Document(title, ParentNode("div", children, None), list(dict.fromkeys(links)) if links else (), text or ())
+
+
+def stream_document(source_path, cache=None, basepath="/", stage=no_stage, collect_links=False, collect_text=False):
+    # Reads the source but leaves parsing to StreamedDocument.render_to()
+    with stage("read"):
+        with open(source_path, 'r', encoding='utf-8') as markdown_file:
+            markdown = markdown_file.read()
+    return StreamedDocument(markdown, cache, basepath, collect_links, collect_text)
+
+
+def load_document(source_path, cache=None, basepath="/", stage=no_stage, documents=None, collect_links=False,
+                  collect_text=False):
+    # documents, when given, is a dict the caller keeps between builds:
+    # (source_path, basepath, collect_links, collect_text) -> (mtime_ns, size, Document). A document is
+    # reused until its source's mtime or size changes, so a long-running
+    # caller doesn't read or parse a page again e.g. after a template edit.
+    # One-shot builds parse every page once and pass None.
+    stat = os.stat(source_path)
+    key = (source_path, basepath, collect_links, collect_text)
+    cached = documents.get(key) if documents is not None else None
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with stage("read"):
+        with open(source_path, 'r', encoding='utf-8') as markdown_file:
+            markdown = markdown_file.read()
+    document = parse_document(markdown, cache, basepath, stage, collect_links, collect_text)
+
+    if documents is not None:
+        documents[key] = (stat.st_mtime_ns, stat.st_size, document)
+    return document
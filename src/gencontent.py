@@ -1,50 +1,387 @@
 import os
-from blocktype import markdown_to_html_node
-from extract_tag import extract_title
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from buildlog import log, set_level
+from copystatic import remove_empty_dirs
+from document import MappedDocument, load_document, stream_document
+from manifest import hash_file, load_manifest, save_manifest
+from profiler import PageProfile, no_stage
+from search import SearchIndex, encode_postings, shard_postings
+from rendercache import parser_version
+from template import load_template
 from pathlib import Path
 
-def generate_page(from_path, template_path, dest_path, basepath):
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-    with open(from_path, 'r', encoding='utf-8') as markdown_file:
-        markdown_content = markdown_file.read()
+# Sources at least this large are memory-mapped and streamed block by block
+default_mmap_threshold = 64 * 1024 * 1024
 
-    with open(template_path, 'r', encoding='utf-8') as template_file:
-        template_content = template_file.read()
 
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
+def generate_page(from_path, template_path, dest_path, basepath, cache=None, profile=False,
+                  mmap_threshold=default_mmap_threshold, size=None, documents=None, collect_links=False,
+                  collect_text=False):
+    # Returns (the parsed document, whether dest_path was written, PageProfile
+    # or None when profile is off). A page whose output is byte-for-byte what
+    # dest_path already holds is left alone, mtime included. size is the
+    # source's size when the caller already knows it. Pages are parsed block
+    # by block as they are written, unless the caller keeps parsed documents
+    # (documents, passed on to load_document()) or profiles, which times each
+    # parsing step on its own. With collect_links the document lists the
+    # page's link and image targets, and with collect_text its plain text.
+    page_profile = PageProfile(from_path) if profile else None
+    stage = page_profile.stage if profile else no_stage
 
-    title = extract_title(markdown_content)
-    template = template_content.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-    # Replace href="/ and src="/ with the specified basepath
-    template = template.replace('href="/', f'href="{basepath}')
-    template = template.replace('src="/', f'src="{basepath}')
+    if size is None:
+        size = os.path.getsize(from_path)
+    if size >= mmap_threshold:
+        document, written = generate_mapped_page(from_path, template_path, dest_path, basepath, cache, stage,
+                                                 collect_links, collect_text)
+        log.verbose(f"{'Generated' if written else 'Unchanged'} page: {dest_path} from {from_path} (memory-mapped)")
+        return document, written, page_profile
 
+    if documents is not None or profile:
+        document = load_document(from_path, cache, basepath, stage, documents, collect_links, collect_text)
+    else:
+        document = stream_document(from_path, cache, basepath, stage, collect_links, collect_text)
+    template = load_template(template_path, basepath)
+    # The page is rendered straight into the file, so filling the template,
+    # rendering and writing are timed as one stage
+    with stage("write"):
+        written = write_page(dest_path, template, document.title, document.render_to)
+
+    log.verbose(f"{'Generated' if written else 'Unchanged'} page: {dest_path} from {from_path}")
+    return document, written, page_profile
+
+
+def generate_mapped_page(from_path, template_path, dest_path, basepath, cache=None, stage=no_stage,
+                         collect_links=False, collect_text=False):
+    # Returns (the document, whether dest_path was written)
+    with stage("read"):
+        document = MappedDocument(from_path, cache, basepath, collect_links, collect_text)
+    with document:
+        template = load_template(template_path, basepath)
+        # Parsing, rendering and writing are interleaved block by block,
+        # so they are timed as one stage
+        with stage("write"):
+            written = write_page(dest_path, template, document.title, document.render_to)
+    return document, written
+
+
+class PageWriter:
+    # A write() sink for one page. While the output matches dest_path's
+    # current bytes nothing is written; at the first difference the matching
+    # prefix is copied into a hidden .<name>.tmp beside it and writing
+    # carries on there. close() renames the temporary file into place, so an
+    # interrupted build never leaves half-written HTML under a page's name.
+
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        dest_dir_path, dest_name = os.path.split(dest_path)
+        self.tmp_path = os.path.join(dest_dir_path, f".{dest_name}.tmp")
+        self.matched = 0
+        self.tmp_file = None
+        try:
+            self.current_file = open(dest_path, "rb")
+        except FileNotFoundError:
+            self.current_file = None
+            self.tmp_file = open(self.tmp_path, "wb")
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        if self.tmp_file is None:
+            if self.current_file.read(len(data)) == data:
+                self.matched += len(data)
+                return
+            self._start_tmp_file()
+        self.tmp_file.write(data)
+
+    def _start_tmp_file(self):
+        self.tmp_file = open(self.tmp_path, "wb")
+        self.current_file.seek(0)
+        remaining = self.matched
+        while remaining:
+            chunk = self.current_file.read(min(remaining, 1024 * 1024))
+            self.tmp_file.write(chunk)
+            remaining -= len(chunk)
+
+    def close(self):
+        # Returns whether dest_path was replaced
+        if self.tmp_file is None:
+            if self.current_file.read(1) == b"":
+                self.current_file.close()
+                return False
+            # The current file is longer than the new page
+            self._start_tmp_file()
+        if self.current_file is not None:
+            self.current_file.close()
+        self.tmp_file.close()
+        os.replace(self.tmp_path, self.dest_path)
+        return True
+
+    def abort(self):
+        if self.current_file is not None:
+            self.current_file.close()
+        if self.tmp_file is not None:
+            self.tmp_file.close()
+            os.remove(self.tmp_path)
+
+
+def write_page(dest_path, template, title, write_content):
+    # Streams the page through a PageWriter; returns whether dest_path was
+    # written. Only the fragment being written and the file buffers are held
+    # in memory.
     dest_dir_path = os.path.dirname(dest_path)
     if dest_dir_path != "":
         os.makedirs(dest_dir_path, exist_ok=True)
 
-    with open(dest_path, "w", encoding="utf-8") as dest_file:
-        dest_file.write(template)
+    writer = PageWriter(dest_path)
+    try:
+        template.render_to(writer.write, title, write_content)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def content_dest_path(from_path, dir_path_content, dest_dir_path):
+    rel_path = os.path.relpath(from_path, dir_path_content)
+    return str(Path(os.path.join(dest_dir_path, rel_path)).with_suffix(".html"))
+
+
+# One page of a build: source and output paths plus the source's size and
+# mtime (ns) as seen by the directory scan
+PlannedPage = namedtuple("PlannedPage", ["source", "dest", "size", "mtime"])
+
+
+def plan_build(dir_path_content, dest_dir_path):
+    # Every source under dir_path_content, sorted by name within each
+    # directory so builds are reproducible. os.scandir() reports file types
+    # without a stat call, so each source is stat'ed once and only once.
+    with os.scandir(dir_path_content) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    plan = []
+    for entry in entries:
+        dest_path = os.path.join(dest_dir_path, entry.name)
+        if entry.is_dir():
+            plan.extend(plan_build(entry.path, dest_path))
+        else:
+            stat = entry.stat()
+            plan.append(PlannedPage(entry.path, str(Path(dest_path).with_suffix(".html")),
+                                    stat.st_size, stat.st_mtime_ns))
+    return plan
+
+
+def schedule(plan, jobs):
+    # Splits the plan into the chunks handed to worker processes; one chunk
+    # when building in-process. Pages are dealt into the chunks largest first,
+    # back and forth like cards, so every chunk gets a similar amount of
+    # source and one huge page can't trail the build.
+    if jobs <= 1 or len(plan) <= 1:
+        return [plan]
+    chunks = [[] for _ in range(min(len(plan), jobs * 4))]
+    by_size = sorted(plan, key=lambda page: page.size, reverse=True)
+    for start in range(0, len(by_size), len(chunks)):
+        hand = by_size[start:start + len(chunks)]
+        if start // len(chunks) % 2:
+            hand.reverse()
+        for chunk, page in zip(chunks, hand):
+            chunk.append(page)
+    return chunks
+
+
+# What a worker sends back for each generated page. links is None unless the
+# build collects links; postings is the page's encoded search.shard_postings(),
+# or None when the build has no search index.
+PageResult = namedtuple("PageResult", ["links", "title", "written", "postings", "profile"])
 
-    print(f"Generated page: {dest_path}")
+# What generate_pages_incremental() did: pages generated, how many of those
+# changed on disk (the rest already matched), and stale pages deleted
+PageCounts = namedtuple("PageCounts", ["generated", "written", "removed"])
 
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path, basepath)
+class PageGenerationError(ValueError):
+    def __init__(self, failures):
+        self.failures = failures
+        details = "\n".join(f"  {from_path}: {error}" for from_path, error in failures)
+        super().__init__(f"failed to generate {len(failures)} page(s):\n{details}")
+
+
+def _generate_page_task(task):
+    # Returns (failure, PageResult); failure is (from_path, message) or None
+    (from_path, template_path, dest_path, size, basepath, cache, profile, mmap_threshold, search_shards,
+     collect_links) = task
+    try:
+        document, written, page_profile = generate_page(from_path, template_path, dest_path, basepath, cache,
+                                                        profile, mmap_threshold, size, collect_links=collect_links,
+                                                        collect_text=search_shards > 0)
+    except Exception as e:
+        return (from_path, f"{type(e).__name__}: {e}"), None
+    # Tokenized here so worker processes share the work
+    postings = encode_postings(shard_postings(document.text, search_shards)) if search_shards else None
+    links = list(document.links) if collect_links else None
+    return None, PageResult(links, document.title, written, postings, page_profile)
+
+
+def _generate_page_chunk_task(tasks):
+    results = [_generate_page_task(task) for task in tasks]
+    # Worker processes exit without flushing, so don't leave lines buffered
+    log.flush()
+    return results
+
+
+def _collect_results(pages, results, profiler, on_page):
+    # Results are handled as they arrive rather than gathered into a list
+    failures = []
+    total_bytes = sum(page.size for page in pages)
+    done_bytes = 0
+    for done, (page, (failure, result)) in enumerate(zip(pages, results), 1):
+        done_bytes += page.size
+        log.progress(done, len(pages), done_bytes, total_bytes)
+        if failure is not None:
+            failures.append(failure)
+            continue
+        if result.profile is not None:
+            profiler.add(result.profile)
+        if on_page is not None:
+            on_page(page.source, page.dest, result)
+    return failures
+
+
+def generate_pages(pages, template_path, basepath, jobs=1, cache=None, profiler=None,
+                   mmap_threshold=default_mmap_threshold, search_shards=0, on_page=None, collect_links=False):
+    # pages is a list of PlannedPage. on_page(from_path, dest_path, PageResult)
+    # is called for each generated page.
+    profile = profiler is not None
+    chunks = schedule(pages, jobs)
+    pages = [page for chunk in chunks for page in chunk]
+    tasks = [
+        [(page.source, template_path, page.dest, page.size, basepath, cache, profile, mmap_threshold, search_shards,
+          collect_links)
+         for page in chunk]
+        for chunk in chunks
+    ]
+    if len(tasks) > 1:
+        # Pages are independent; whole chunks go to the workers to keep IPC overhead low
+        with ProcessPoolExecutor(max_workers=jobs, initializer=set_level, initargs=(log.level,)) as executor:
+            results = chain.from_iterable(executor.map(_generate_page_chunk_task, tasks))
+            failures = _collect_results(pages, results, profiler, on_page)
+    else:
+        failures = _collect_results(pages, map(_generate_page_task, tasks[0]), profiler, on_page)
+
+    if failures:
+        raise PageGenerationError(failures)
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath, jobs=1, cache=None, profiler=None,
+                             mmap_threshold=default_mmap_threshold):
+    pages = plan_build(dir_path_content, dest_dir_path)
+    generate_pages(pages, template_path, basepath, jobs, cache, profiler, mmap_threshold)
+
+
+def generate_pages_incremental(dir_path_content, template_path, dest_dir_path, basepath, jobs=1, cache=None, profiler=None,
+                               mmap_threshold=default_mmap_threshold, search_shards=0, force=False,
+                               collect_links=False):
+    # Regenerates pages whose sources changed since the last build, or every
+    # page with force. Returns PageCounts. With search_shards set, the search
+    # index in dest_dir_path is kept in step. With collect_links each page's
+    # link targets are recorded in the manifest for linkcheck.
+    search_index = SearchIndex(dest_dir_path, basepath, search_shards) if search_shards else None
+    previous = load_manifest(dest_dir_path)
+    previous_pages = previous.get("pages", {})
+    template_hash = hash_file(template_path)
+    parser = parser_version()
+    # A new template, basepath or parser changes every page
+    rebuild_all = (
+        force
+        or previous.get("template") != template_hash
+        or previous.get("basepath") != basepath
+        or previous.get("parser") != parser
+    )
+
+    pages = {}
+    stale = []
+    for page in plan_build(dir_path_content, dest_dir_path):
+        from_path, dest_path = page.source, page.dest
+        entry = previous_pages.get(from_path)
+        if entry and entry["size"] == page.size and entry["mtime"] == page.mtime:
+            # Unchanged size and mtime: trust the recorded hash instead of re-reading the file
+            source_hash = entry["hash"]
         else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            source_hash = hash_file(from_path)
+
+        if (
+            rebuild_all
+            or entry is None
+            or entry["hash"] != source_hash
+            or entry["dest"] != dest_path
+            or not os.path.exists(dest_path)
+            or (search_index is not None and not search_index.is_current(from_path, source_hash))
+            # Built without collecting links, so they aren't known
+            or (collect_links and "links" not in entry)
+        ):
+            stale.append(page)
+
+        pages[from_path] = {
+            "hash": source_hash,
+            "size": page.size,
+            "mtime": page.mtime,
+            "dest": dest_path,
+        }
+        if entry and "links" in entry:
+            # Link and image targets; replaced below for pages that are rebuilt
+            pages[from_path]["links"] = entry["links"]
+
+    removed = remove_stale_pages(previous_pages, pages, dest_dir_path)
+    if search_index is not None:
+        for from_path in [from_path for from_path in search_index.pages if from_path not in pages]:
+            search_index.remove_page(from_path)
+
+    written = 0
+
+    def on_page(from_path, dest_path, result):
+        nonlocal written
+        written += result.written
+        if result.links is not None:
+            pages[from_path]["links"] = result.links
+        else:
+            pages[from_path].pop("links", None)
+        if search_index is not None:
+            search_index.add_page(from_path, pages[from_path]["hash"], dest_path, result.title, result.postings)
+
+    manifest = {"template": template_hash, "basepath": basepath, "parser": parser, "pages": pages}
+    try:
+        generate_pages(stale, template_path, basepath, jobs, cache, profiler, mmap_threshold, search_shards, on_page,
+                       collect_links)
+    except PageGenerationError as e:
+        # Forget failed pages so the next build retries them
+        for from_path, _ in e.failures:
+            pages.pop(from_path, None)
+            if search_index is not None:
+                search_index.remove_page(from_path)
+        save_search_index(search_index)
+        save_manifest(dest_dir_path, manifest)
+        raise
+    save_search_index(search_index)
+    save_manifest(dest_dir_path, manifest)
+    return PageCounts(len(stale), written, removed)
+
+
+def save_search_index(search_index):
+    if search_index is None:
+        return
+    shards = search_index.commit()
+    log.verbose(f"Search index: {len(search_index.pages)} page(s), {shards} shard(s) updated")
 
 
-def extract_title(md):
-    lines = md.split("\n")
-    for line in lines:
-        if line.startswith("# "):
-            return line[2:].strip()
-    raise ValueError("no title found")
+def remove_stale_pages(previous_pages, pages, dest_dir_path):
+    current_dests = {entry["dest"] for entry in pages.values()}
+    removed = 0
+    for from_path, entry in previous_pages.items():
+        dest_path = entry["dest"]
+        if from_path in pages or dest_path in current_dests:
+            continue
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+            log.verbose(f"Removed stale page: {dest_path}")
+            removed += 1
+        remove_empty_dirs(os.path.dirname(dest_path), dest_dir_path)
+    return removed
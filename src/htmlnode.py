@@ -1,7 +1,26 @@
 from textnode import TextNode, TextType
-from splitnode import split_nodes_link, split_nodes_image, split_nodes_delimiter
+from splitnode import split_nodes_inline
+
+
+def escape_text(text):
+    # Most text has nothing to escape; the membership scans are much cheaper
+    # than rebuilding the string, and than a regex search
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attribute(value):
+    # Attribute values are always double quoted
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+
 
 class HTMLNode:
+    # Pages allocate thousands of nodes, so skip the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -9,14 +28,23 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        chunks = []
+        self.render_to(chunks.append)
+        return "".join(chunks)
+
+    def render_to(self, write):
+        # Stream the HTML to write() fragment by fragment, e.g. list.append or file.write
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
-        if self.props is None:
+        if not self.props:
             return ""
+        # Nodes carry one or two attributes, where appending beats building a
+        # list to join. Values are written as given: text_node_to_html_node
+        # escapes them once when the node is built.
         props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
+        for prop, value in self.props.items():
+            props_html += f' {prop}="{value}"'
         return props_html
 
     def __repr__(self):
@@ -24,82 +52,126 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
+        # Assigned directly rather than via super().__init__ to keep allocation cheap
+        self.tag = tag
+        self.value = value
+        self.children = None
+        self.props = props
 
     def to_html(self):
         if self.value is None:
             raise ValueError("invalid HTML: no value")
         if self.tag is None:
             return self.value
+        if not self.props:
+            return f"<{self.tag}>{self.value}</{self.tag}>"
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def render_to(self, write):
+        write(self.to_html())
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
+        self.tag = tag
+        self.value = None
+        self.children = children
+        self.props = props
 
-    def to_html(self):
+    def render_to(self, write):
         if self.tag is None:
             raise ValueError("invalid HTML: no tag")
         if self.children is None:
             raise ValueError("invalid HTML: no children")
-        children_html = ""
+        write(f"<{self.tag}{self.props_to_html()}>")
         for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+            child.render_to(write)
+        write(f"</{self.tag}>")
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
 
-def text_node_to_html_node(text_node):
+class RawNode(HTMLNode):
+    # Already rendered HTML, e.g. a block restored from the render cache.
+    # links and text keep what parsing collected from the markup it replaced.
+    __slots__ = ("links", "text")
+
+    def __init__(self, html, links=(), text=()):
+        self.tag = None
+        self.value = html
+        self.children = None
+        self.props = None
+        self.links = links
+        self.text = text
+
+    def to_html(self):
+        return self.value
+
+    def render_to(self, write):
+        write(self.value)
+
+    def __repr__(self):
+        return f"RawNode({self.value})"
+
+def resolve_url(url, basepath="/"):
+    # Site-absolute URLs get the basepath prefix; relative, external and
+    # protocol-relative (//host) URLs are left alone
+    if basepath == "/" or not url.startswith("/") or url.startswith("//"):
+        return url
+    return basepath + url[1:]
+
+
+def text_node_to_html_node(text_node, basepath="/"):
     if not isinstance(text_node, TextNode):
         raise ValueError("Input must be an instance of TextNode")
 
+    # Values are escaped here, once, so rendering writes them as is. The
+    # check is inlined: almost every value has nothing to escape.
+    text = text_node.text
+    if "&" in text or "<" in text or ">" in text:
+        text = escape_text(text)
+
     if text_node.text_type == TextType.TEXT:
         # No tag, just raw text
-        return LeafNode(tag=None, value=text_node.text)
+        return LeafNode(tag=None, value=text)
 
     elif text_node.text_type == TextType.BOLD:
         # "b" tag with text
-        return LeafNode(tag="b", value=text_node.text)
+        return LeafNode(tag="b", value=text)
 
     elif text_node.text_type == TextType.ITALIC:
         # "i" tag with text
-        return LeafNode(tag="i", value=text_node.text)
+        return LeafNode(tag="i", value=text)
 
     elif text_node.text_type == TextType.CODE:
         # "code" tag with text
-        return LeafNode(tag="code", value=text_node.text)
+        return LeafNode(tag="code", value=text)
 
     elif text_node.text_type == TextType.LINK:
         # "a" tag with text and "href" prop
         if not text_node.url:
             raise ValueError("TextNode of type LINK must have a URL")
-        return LeafNode(tag="a", value=text_node.text, props={"href": text_node.url})
+        return LeafNode(tag="a", value=text, props={"href": escape_attribute(resolve_url(text_node.url, basepath))})
 
     elif text_node.text_type == TextType.IMAGE:
         # "img" tag with "src" and "alt" props
         if not text_node.url:
             raise ValueError("TextNode of type IMAGE must have a URL for 'src'")
-        return LeafNode(tag="img", value="", props={"src": text_node.url, "alt": text_node.text})
+        src = escape_attribute(resolve_url(text_node.url, basepath))
+        return LeafNode(tag="img", value="", props={"src": src, "alt": escape_attribute(text_node.text)})
 
     else:
         # Raise an error for unsupported TextType
         raise ValueError(f"Unsupported TextType: {text_node.text_type}")
 
 def text_to_textnodes(text):
-    # Initialize the text as a single text node
-    nodes = [TextNode(text, TextType.TEXT)]
-
-    # Use each split function one after the other
-    nodes = split_nodes_image(nodes)  # Process images
-    nodes = split_nodes_link(nodes)  # Process links
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)  # Process bold text
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)  # Process italic text
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)  # Process code blocks
-
-    return nodes
\ No newline at end of file
+    # Images, links, bold, italic and code are all found in one left-to-right scan
+    return split_nodes_inline([TextNode(text, TextType.TEXT)])
@@ -0,0 +1,60 @@
+import os
+import posixpath
+from urllib.parse import unquote, urlsplit
+from manifest import STATIC_MANIFEST_FILENAME, load_manifest
+
+
+def output_paths(public_dir_path, pages, static_files):
+    # Every file a link can point at, as /-separated paths relative to the site root
+    targets = {os.path.relpath(entry["dest"], public_dir_path).replace(os.sep, "/") for entry in pages.values()}
+    targets.update(path.replace(os.sep, "/") for path in static_files)
+    return targets
+
+
+def resolve_link(url, page_dir):
+    # The site-relative path a link points at, or None for external links and
+    # links within the same page
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc:
+        return None
+    path = unquote(parts.path)
+    if not path:
+        return None
+    if path.startswith("/"):
+        path = path[1:]
+    else:
+        path = posixpath.join(page_dir, path)
+    path = posixpath.normpath(path)
+    return "" if path == "." else path
+
+
+def is_target(path, targets):
+    # /blog/tom may be served as blog/tom, blog/tom.html or blog/tom/index.html
+    return (
+        path in targets
+        or f"{path}.html" in targets
+        or posixpath.join(path, "index.html") in targets
+    )
+
+
+def find_broken_links(public_dir_path, pages, static_files):
+    # pages is the page manifest: {from_path: {"dest": ..., "links": [...]}}.
+    # Returns (links checked, [(from_path, url), ...] for internal targets that don't exist)
+    targets = output_paths(public_dir_path, pages, static_files)
+    checked = 0
+    broken = []
+    for from_path, entry in pages.items():
+        page_dir = posixpath.dirname(os.path.relpath(entry["dest"], public_dir_path).replace(os.sep, "/"))
+        for url in entry.get("links", ()):
+            checked += 1
+            path = resolve_link(url, page_dir)
+            if path is not None and not is_target(path, targets):
+                broken.append((from_path, url))
+    return checked, broken
+
+
+def check_links(public_dir_path):
+    # Uses the link targets recorded in the build manifests, so no output is read
+    pages = load_manifest(public_dir_path).get("pages", {})
+    static_files = load_manifest(public_dir_path, STATIC_MANIFEST_FILENAME).get("files", [])
+    return find_broken_links(public_dir_path, pages, static_files)
@@ -1,7 +1,16 @@
-from gencontent import generate_page, generate_pages_recursive
+from buildlog import QUIET, SUMMARY, VERBOSE, log, set_level
+from copystatic import copy_files_recursive
+from devserver import SiteWatcher, serve
+from gencontent import PageGenerationError, default_mmap_threshold, generate_pages_incremental
+from linkcheck import check_links
+from profiler import BuildProfiler, no_stage
+from rendercache import RenderCache
+from search import default_search_shards
+import argparse
 import os
 import shutil
 import sys
+import time
 
 dir_path_static = "./static"
 dir_path_public = "./docs"
@@ -11,32 +20,159 @@ default_basepath = "/"
 
 
 def delete_directory(directory_path):
-    print("Deleting public directory...")
+    log.verbose("Deleting public directory...")
     if os.path.exists(directory_path):
         shutil.rmtree(directory_path) # Delete all
-        print(f"Deleting public directory: {directory_path}")
+        log.verbose(f"Deleting public directory: {directory_path}")
     else:
-        print(f"Directory does not exist: {directory_path}")
+        log.verbose(f"Directory does not exist: {directory_path}")
 
-def copy_static_files(static_dir, public_dir):
+def copy_static_files(static_dir, public_dir, use_hash=False, link=False):
     if os.path.exists(static_dir):
-        shutil.copytree(static_dir, public_dir, dirs_exist_ok=True)
-        print(f"Copied static files from {static_dir} to {public_dir}")
+        result = copy_files_recursive(static_dir, public_dir, use_hash, link)
+        megabytes = result.bytes_copied / 1e6
+        throughput = megabytes / result.seconds if result.seconds else 0
+        log.verbose(f"Synced {result.files} static file(s) from {static_dir} to {public_dir}: "
+              f"{result.copied} copied ({megabytes:.2f} MB), {result.removed} removed, "
+              f"{result.files - result.copied} unchanged in {result.seconds:.3f}s ({throughput:.1f} MB/s)")
     else:
-        print(f"Static directory does not exist: {static_dir}")
+        log.verbose(f"Static directory does not exist: {static_dir}")
 
 
-def main():
-    # Determine the base path from the CLI argument. If not detault to "/".
-    basepath = sys.argv[1] if len(sys.argv) > 1 else "/"
+def add_verbosity_args(parser):
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("-q", "--quiet", dest="log_level", action="store_const", const=QUIET, default=SUMMARY,
+                       help="only print errors")
+    group.add_argument("-v", "--verbose", dest="log_level", action="store_const", const=VERBOSE,
+                       help="print a line for every page and build step")
 
 
-    delete_directory(dir_path_public)
-    copy_static_files(dir_path_static, dir_path_public)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site.")
+    parser.add_argument("basepath", nargs="?", default=default_basepath,
+                        help="URL prefix for site-absolute links (default: /)")
+    add_verbosity_args(parser)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only rebuild pages whose sources changed")
+    parser.add_argument("--clean", action="store_true",
+                        help="delete the output directory before building")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes for page generation (0: one per CPU)")
+    parser.add_argument("--hash-static", action="store_true",
+                        help="compare static files by content when size matches but mtime differs")
+    parser.add_argument("--link-static", action="store_true",
+                        help="hardlink static files into the output instead of copying where possible")
+    parser.add_argument("--render-cache", metavar="DIR",
+                        help="reuse rendered HTML for identical blocks across pages and builds")
+    parser.add_argument("--render-cache-size", type=int, default=256, metavar="MB",
+                        help="evict least recently used render cache entries above this size (default: 256)")
+    parser.add_argument("--mmap-threshold", type=int, default=default_mmap_threshold // (1024 * 1024), metavar="MB",
+                        help="memory-map sources at least this large and stream them block by block "
+                             f"(default: {default_mmap_threshold // (1024 * 1024)})")
+    parser.add_argument("--check-links", action="store_true",
+                        help="report links and images that point at pages or static files that don't exist")
+    parser.add_argument("--search", action="store_true",
+                        help="write a sharded full-text search index to <output>/search/")
+    parser.add_argument("--search-shards", type=int, default=default_search_shards, metavar="N",
+                        help=f"number of search index shards (default: {default_search_shards})")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every build stage per page and write a Chrome trace")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to list with --profile (default: 10)")
+    parser.add_argument("--profile-output", default="build-trace.json", metavar="PATH",
+                        help="where --profile writes the trace-event JSON (default: build-trace.json)")
+    return parser.parse_args(argv)
 
-    print("Generating page...")
 
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public, basepath)
+def parse_serve_args(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve it locally.")
+    parser.add_argument("basepath", nargs="?", default=default_basepath,
+                        help="URL prefix for site-absolute links (default: /)")
+    parser.add_argument("--port", type=int, default=8888, help="port to serve on (default: 8888)")
+    parser.add_argument("--watch", action="store_true",
+                        help="rebuild affected pages when content, static files or the template change")
+    parser.add_argument("--interval", type=float, default=0.1,
+                        help="seconds between checks for changed files (default: 0.1)")
+    add_verbosity_args(parser)
+    return parser.parse_args(argv)
+
+
+def build(basepath, incremental=False, jobs=1, hash_static=False, link_static=False, cache=None, profiler=None,
+          mmap_threshold=default_mmap_threshold, links=False, search_shards=0, clean=False):
+    stage = profiler.stage if profiler else no_stage
+
+    if clean:
+        with stage("delete output"):
+            delete_directory(dir_path_public)
+    with stage("static files"):
+        copy_static_files(dir_path_static, dir_path_public, hash_static, link_static)
+
+    log.verbose("Generating page...")
+
+    # Without --incremental every page is regenerated, but pages whose output
+    # is unchanged are not rewritten, so their mtimes survive for rsync or a CDN.
+    start = time.perf_counter()
+    try:
+        with stage("pages"):
+            counts = generate_pages_incremental(
+                dir_path_content, template_path, dir_path_public, basepath, jobs, cache, profiler, mmap_threshold,
+                search_shards, force=not incremental, collect_links=links
+            )
+    except PageGenerationError as e:
+        log.error(str(e))
+        sys.exit(1)
+    seconds = time.perf_counter() - start
+
+    if cache is not None:
+        entries, size = cache.prune()
+        log.verbose(f"Render cache: {entries} entries, {size / 1e6:.2f} MB")
+
+    rate = counts.generated / seconds if seconds else 0
+    log.info(f"Generated {counts.generated} page(s) in {seconds:.2f}s ({rate:.0f} pages/s): "
+             f"{counts.written} written, {counts.generated - counts.written} unchanged, "
+             f"{counts.removed} stale page(s) deleted")
+
+    if links:
+        with stage("check links"):
+            checked, broken = check_links(dir_path_public)
+        for from_path, url in broken:
+            log.error(f"Broken link in {from_path}: {url}")
+        log.info(f"Checked {checked} link(s), {len(broken)} broken")
+        if broken:
+            sys.exit(1)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv[:1] == ["serve"]:
+        args = parse_serve_args(argv[1:])
+        set_level(args.log_level)
+        build(args.basepath, incremental=True)
+        watcher = None
+        if args.watch:
+            watcher = SiteWatcher(dir_path_content, dir_path_static, template_path, dir_path_public, args.basepath)
+        serve(dir_path_public, args.port, watcher, args.interval)
+        return
+
+    args = parse_args(argv)
+    set_level(args.log_level)
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+    cache = None
+    if args.render_cache:
+        try:
+            cache = RenderCache(args.render_cache, args.render_cache_size * 1024 * 1024)
+        except ValueError as e:
+            log.error(str(e))
+            sys.exit(1)
+    profiler = BuildProfiler() if args.profile else None
+    build(args.basepath, args.incremental, jobs, args.hash_static, args.link_static, cache, profiler,
+          args.mmap_threshold * 1024 * 1024, args.check_links, args.search_shards if args.search else 0, args.clean)
+
+    if profiler is not None:
+        log.info(profiler.report(args.profile_top))
+        profiler.write_trace(args.profile_output)
+        log.info(f"Wrote trace events to {args.profile_output}")
 
 # Call the main function when the script runs
 if __name__ == "__main__":
@@ -0,0 +1,34 @@
+import hashlib
+import json
+import os
+
+MANIFEST_FILENAME = ".manifest.json"
+STATIC_MANIFEST_FILENAME = ".static-manifest.json"
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    # Read in chunks so hashing a huge source doesn't hold it in memory
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(dest_dir_path, filename=MANIFEST_FILENAME):
+    path = os.path.join(dest_dir_path, filename)
+    try:
+        with open(path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (FileNotFoundError, ValueError):
+        # A missing or corrupt manifest just means everything gets rebuilt
+        return {}
+
+
+def save_manifest(dest_dir_path, manifest, filename=MANIFEST_FILENAME):
+    os.makedirs(dest_dir_path, exist_ok=True)
+    path = os.path.join(dest_dir_path, filename)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -0,0 +1,106 @@
+import contextlib
+import json
+import os
+import sys
+import time
+
+# Pages are rendered straight into their output file, so "write" includes
+# filling the template and rendering
+PAGE_STAGES = ("read", "block split", "classify", "inline parse", "write")
+
+
+class PageProfile:
+    # Wall time and the change in live memory blocks (sys.getallocatedblocks())
+    # for each stage of one page. Frees cancel allocations, so the block
+    # figure is what a stage left behind, not how much it allocated; it can be
+    # zero or negative. Built in whichever process generated the page and sent
+    # back to the parent, so it only holds plain data.
+
+    def __init__(self, path):
+        self.path = path
+        self.pid = os.getpid()
+        self.stages = []  # (name, start_ns, duration_ns, net_live_blocks)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        blocks = sys.getallocatedblocks()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            self.stages.append((name, start, duration, sys.getallocatedblocks() - blocks))
+
+    @property
+    def total_ns(self):
+        return sum(duration for _, _, duration, _ in self.stages)
+
+    def __repr__(self):
+        return f"PageProfile({self.path}, {self.total_ns / 1e6:.3f} ms)"
+
+
+class BuildProfiler:
+    def __init__(self):
+        self.pages = []
+        self.build_stages = []  # (name, start_ns, duration_ns)
+
+    def add(self, page_profile):
+        self.pages.append(page_profile)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.build_stages.append((name, start, time.perf_counter_ns() - start))
+
+    def stage_totals(self):
+        totals = {}
+        for page in self.pages:
+            for name, _, duration, blocks in page.stages:
+                total_ns, total_blocks = totals.get(name, (0, 0))
+                totals[name] = (total_ns + duration, total_blocks + blocks)
+        return totals
+
+    def report(self, top=10):
+        lines = [f"Profiled {len(self.pages)} page(s)", "", f"{'stage':<14} {'total ms':>10} {'net live blocks':>16}"]
+        totals = self.stage_totals()
+        for name in PAGE_STAGES:
+            if name in totals:
+                total_ns, blocks = totals[name]
+                lines.append(f"{name:<14} {total_ns / 1e6:>10.2f} {blocks:>16}")
+
+        slowest = sorted(self.pages, key=lambda page: page.total_ns, reverse=True)[:top]
+        lines += ["", f"Slowest {len(slowest)} page(s):", f"{'ms':>9}  {'slowest stage':<14} page"]
+        for page in slowest:
+            name, _, duration, _ = max(page.stages, key=lambda stage: stage[2])
+            lines.append(f"{page.total_ns / 1e6:>9.2f}  {name:<14} {page.path} ({duration / 1e6:.2f} ms)")
+        return "\n".join(lines)
+
+    def trace_events(self):
+        # Chrome trace-event format; load the file in chrome://tracing or Perfetto
+        events = []
+        main_pid = os.getpid()
+        for name, start, duration in self.build_stages:
+            events.append({"name": name, "cat": "build", "ph": "X", "pid": main_pid, "tid": 0,
+                           "ts": start / 1000, "dur": duration / 1000})
+        for page in self.pages:
+            if not page.stages:
+                continue
+            first_start = page.stages[0][1]
+            events.append({"name": page.path, "cat": "page", "ph": "X", "pid": page.pid, "tid": 1,
+                           "ts": first_start / 1000, "dur": page.total_ns / 1000})
+            for name, start, duration, blocks in page.stages:
+                events.append({"name": name, "cat": "stage", "ph": "X", "pid": page.pid, "tid": 1,
+                               "ts": start / 1000, "dur": duration / 1000,
+                               "args": {"page": page.path, "net_live_blocks": blocks}})
+        return events
+
+    def write_trace(self, path):
+        with open(path, "w", encoding="utf-8") as trace_file:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, trace_file)
+
+
+def no_stage(name):
+    return contextlib.nullcontext()
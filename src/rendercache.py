@@ -0,0 +1,154 @@
+import hashlib
+import importlib
+import json
+import os
+import re
+import shutil
+from htmlnode import RawNode
+
+# Bump when the on-disk entry format changes
+CACHE_FORMAT = 4
+
+# Any edit to these modules can change rendered output
+PARSER_MODULES = ("blocktype", "document", "htmlnode", "splitnode", "textnode")
+
+VERSION_FILENAME = "VERSION"
+
+# Entries live in directories named after the first two hex digits of their key
+_shard_pattern = re.compile(r"[0-9a-f]{2}")
+
+
+def parser_version():
+    digest = hashlib.sha256(f"format {CACHE_FORMAT}".encode("utf-8"))
+    for name in PARSER_MODULES:
+        with open(importlib.import_module(name).__file__, "rb") as module_file:
+            digest.update(module_file.read())
+    return digest.hexdigest()
+
+
+class RenderCache:
+    # Disk-backed map from (basepath, block source text) to the block's
+    # rendered HTML. Entries are content addressed, so identical blocks are
+    # parsed once across pages, worker processes and builds. Recency is
+    # tracked with file mtimes and prune() evicts least recently used entries.
+    # An entry is a JSON line with the block's link targets and plain text,
+    # then its HTML.
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024, min_block_size=64):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # Tiny blocks parse faster than a file read
+        self.min_block_size = min_block_size
+        self.version = parser_version()
+        self._memory = {}
+        self._check_version()
+
+    def _check_version(self):
+        version_path = os.path.join(self.cache_dir, VERSION_FILENAME)
+        try:
+            with open(version_path, "r", encoding="utf-8") as version_file:
+                if version_file.read() == self.version:
+                    return
+        except FileNotFoundError:
+            # Never clear a directory the cache didn't create
+            if os.path.isdir(self.cache_dir) and os.listdir(self.cache_dir):
+                raise ValueError(f"{self.cache_dir} is not empty and has no {VERSION_FILENAME} file, "
+                                 "so it isn't a render cache")
+        # The parser changed: every entry is stale
+        self._clear()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(version_path, "w", encoding="utf-8") as version_file:
+            version_file.write(self.version)
+
+    def _clear(self):
+        # Removes only what the cache writes: shard directories and temp files
+        if not os.path.isdir(self.cache_dir):
+            return
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_dir(follow_symlinks=False) and _shard_pattern.fullmatch(entry.name):
+                shutil.rmtree(entry.path)
+            elif entry.name.endswith(".tmp") and entry.is_file(follow_symlinks=False):
+                os.remove(entry.path)
+
+    def _entry_path(self, key):
+        basepath, block = key
+        digest = hashlib.sha256(basepath.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(block.encode("utf-8"))
+        key = digest.hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key[2:])
+
+    def get(self, key):
+        if len(key[1]) < self.min_block_size:
+            return None
+        node = self._memory.get(key)
+        if node is not None:
+            return node
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as entry_file:
+                collected = json.loads(entry_file.readline())
+                html = entry_file.read()
+        except FileNotFoundError:
+            return None
+        os.utime(path)  # mark as recently used
+        node = RawNode(html, collected["links"], collected["text"])
+        self._remember(key, node)
+        return node
+
+    def __setitem__(self, key, node):
+        if len(key[1]) < self.min_block_size:
+            return
+        html = node.to_html()
+        links = getattr(node, "links", ())
+        text = getattr(node, "text", ())
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so concurrent workers never read a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8", newline="") as entry_file:
+            entry_file.write(json.dumps({"links": list(links), "text": list(text)}) + "\n")
+            entry_file.write(html)
+        os.replace(tmp_path, path)
+        self._remember(key, RawNode(html, links, text))
+
+    def _remember(self, key, node):
+        if len(self._memory) >= 10_000:
+            self._memory.clear()
+        self._memory[key] = node
+
+    def prune(self):
+        # Evict least recently used entries until the cache fits in max_bytes.
+        # Returns (entries kept, bytes kept).
+        entries = []
+        total = 0
+        for shard in os.scandir(self.cache_dir):
+            # Like _clear(), never touch what the cache didn't write
+            if not (shard.is_dir(follow_symlinks=False) and _shard_pattern.fullmatch(shard.name)):
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        evicted = 0
+        while total > self.max_bytes and evicted < len(entries):
+            _, size, path = entries[evicted]
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        return len(entries) - evicted, total
+
+    def __getstate__(self):
+        # Worker processes get the settings, not the in-memory layer
+        state = self.__dict__.copy()
+        state["_memory"] = {}
+        return state
+
+    def __repr__(self):
+        return f"RenderCache({self.cache_dir}, {self.max_bytes})"
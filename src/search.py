@@ -0,0 +1,211 @@
+import functools
+import json
+import os
+import re
+import shutil
+import tempfile
+from manifest import load_manifest, save_manifest
+
+SEARCH_DIRNAME = "search"
+SEARCH_MANIFEST_FILENAME = ".search-manifest.json"
+PAGES_FILENAME = "pages.json"
+default_search_shards = 64
+
+_word_pattern = re.compile(r"\w+")
+_compact_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def tokenize(text):
+    return _word_pattern.findall(text.lower())
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def term_shard(term, shards):
+    # 32-bit FNV-1a of the UTF-8 bytes, so a browser can find a query term's shard
+    h = 0x811C9DC5
+    for byte in term.encode("utf-8"):
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h % shards
+
+
+def shard_postings(plain_text, shards=default_search_shards):
+    # {shard: {term: [word positions]}} for one page's text, in reading order
+    postings = {}
+    position = 0
+    for piece in plain_text:
+        for term in tokenize(piece):
+            shard_index = term_shard(term, shards)
+            shard = postings.get(shard_index)
+            if shard is None:
+                shard = postings[shard_index] = {}
+            positions = shard.get(term)
+            if positions is None:
+                shard[term] = [position]
+            else:
+                positions.append(position)
+            position += 1
+    return postings
+
+
+def encode_postings(postings):
+    # {shard: JSON of that shard's terms}, so workers do the serializing
+    return {shard: _compact_json.encode(terms) for shard, terms in postings.items()}
+
+
+def shard_filename(shard):
+    return f"terms-{shard:03d}.json"
+
+
+def write_json(path, data):
+    # Hidden, so an interrupted build doesn't leave a publishable file behind
+    dir_path, name = os.path.split(path)
+    tmp_path = os.path.join(dir_path, f".{name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as json_file:
+        # encode() uses the C encoder; json.dump() would stream in pure Python
+        json_file.write(_compact_json.encode(data))
+    os.replace(tmp_path, path)
+
+
+class SearchIndex:
+    # Inverted index written to <public>/search/ for client-side search.
+    # pages.json maps page ids to [url, title]; terms-NNN.json maps each term
+    # in that shard to {page id: [word positions]}. A term lives in shard
+    # term_shard(term, shards). Page ids stay the same while a page exists.
+    #
+    # add_page() and remove_page() only record changes: new postings are
+    # spilled to a run file per shard, and commit() rewrites just the shards
+    # the changed pages used before or use now, one at a time. Memory stays
+    # bounded by one shard rather than the whole site.
+
+    def __init__(self, public_dir_path, basepath="/", shards=default_search_shards):
+        self.public_dir_path = public_dir_path
+        self.basepath = basepath
+        self.shards = shards
+        self.search_dir_path = os.path.join(public_dir_path, SEARCH_DIRNAME)
+        manifest = load_manifest(public_dir_path, SEARCH_MANIFEST_FILENAME)
+        if (
+            manifest.get("shards") != shards
+            or manifest.get("basepath") != basepath
+            or not os.path.isdir(self.search_dir_path)
+        ):
+            # Every page's shard or URL changes: start over
+            manifest = {}
+            shutil.rmtree(self.search_dir_path, ignore_errors=True)
+        # from_path -> {"id", "hash", "url", "title", "shards"}
+        self.pages = manifest.get("pages", {})
+        self.next_id = manifest.get("next_id", 0)
+        self._dirty_shards = set()
+        self._replaced_ids = set()
+        self._spill = None
+        self._runs = {}
+
+    def is_current(self, from_path, source_hash):
+        entry = self.pages.get(from_path)
+        return entry is not None and entry["hash"] == source_hash
+
+    def page_url(self, dest_path):
+        rel_path = os.path.relpath(dest_path, self.public_dir_path).replace(os.sep, "/")
+        if rel_path == "index.html":
+            rel_path = ""
+        elif rel_path.endswith("/index.html"):
+            rel_path = rel_path[:-len("index.html")]
+        return self.basepath + rel_path
+
+    def _forget(self, entry):
+        self._replaced_ids.add(str(entry["id"]))
+        self._dirty_shards.update(entry["shards"])
+
+    def remove_page(self, from_path):
+        entry = self.pages.pop(from_path, None)
+        if entry is not None:
+            self._forget(entry)
+
+    def add_page(self, from_path, source_hash, dest_path, title, postings):
+        # postings is encode_postings(shard_postings()) of the page's text
+        entry = self.pages.get(from_path)
+        if entry is not None:
+            page_id = entry["id"]
+            self._forget(entry)
+        else:
+            page_id = self.next_id
+            self.next_id += 1
+
+        if self._spill is None:
+            self._spill = tempfile.TemporaryDirectory()
+        for shard, terms in postings.items():
+            run = self._runs.get(shard)
+            if run is None:
+                run = self._runs[shard] = open(os.path.join(self._spill.name, str(shard)), "w", encoding="utf-8")
+            run.write(f"[{page_id},{terms}]\n")
+        self._dirty_shards.update(postings)
+
+        self.pages[from_path] = {
+            "id": page_id,
+            "hash": source_hash,
+            "url": self.page_url(dest_path),
+            "title": title,
+            "shards": sorted(postings),
+        }
+
+    def _update_shard(self, shard):
+        path = os.path.join(self.search_dir_path, shard_filename(shard))
+        try:
+            with open(path, "r", encoding="utf-8") as shard_file:
+                terms = json.load(shard_file)
+        except FileNotFoundError:
+            terms = {}
+
+        if self._replaced_ids:
+            for term in list(terms):
+                postings = terms[term]
+                for page_id in self._replaced_ids.intersection(postings):
+                    del postings[page_id]
+                if not postings:
+                    del terms[term]
+
+        run = self._runs.get(shard)
+        if run is not None:
+            with open(run.name, "r", encoding="utf-8") as run_file:
+                for line in run_file:
+                    page_id, page_terms = json.loads(line)
+                    page_id = str(page_id)
+                    for term, positions in page_terms.items():
+                        postings = terms.get(term)
+                        if postings is None:
+                            terms[term] = {page_id: positions}
+                        else:
+                            postings[page_id] = positions
+
+        if terms:
+            write_json(path, terms)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def commit(self):
+        # Returns the number of shards rewritten
+        for run in self._runs.values():
+            run.close()
+        os.makedirs(self.search_dir_path, exist_ok=True)
+        dirty_shards = sorted(self._dirty_shards)
+        for shard in dirty_shards:
+            self._update_shard(shard)
+
+        pages = {entry["id"]: [entry["url"], entry["title"]] for entry in self.pages.values()}
+        write_json(os.path.join(self.search_dir_path, PAGES_FILENAME), {"shards": self.shards, "pages": pages})
+        save_manifest(self.public_dir_path, {
+            "shards": self.shards,
+            "basepath": self.basepath,
+            "next_id": self.next_id,
+            "pages": self.pages,
+        }, SEARCH_MANIFEST_FILENAME)
+
+        if self._spill is not None:
+            self._spill.cleanup()
+        self._spill = None
+        self._runs = {}
+        self._dirty_shards = set()
+        self._replaced_ids = set()
+        return len(dirty_shards)
+
+    def __repr__(self):
+        return f"SearchIndex({self.search_dir_path}, {len(self.pages)} page(s), {self.shards} shard(s))"
@@ -2,6 +2,56 @@ from textnode import TextNode, TextType
 
 import re
 
+# Images, links, bold, italic and code in one alternation. At any position the
+# leftmost construct wins, so e.g. an underscore inside a link URL or a code
+# span is never mistaken for an italic delimiter.
+_inline_pattern = re.compile(
+    r"!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\)"
+    r"|\*\*(?P<bold>.*?)\*\*"
+    r"|_(?P<italic>.*?)_"
+    r"|`(?P<code>.*?)`",
+    re.DOTALL,
+)
+
+_delimiter_text_types = {
+    "bold": TextType.BOLD,
+    "italic": TextType.ITALIC,
+    "code": TextType.CODE,
+}
+
+
+def split_nodes_inline(old_nodes):
+    new_nodes = []
+    for old_node in old_nodes:
+        if old_node.text_type != TextType.TEXT:
+            new_nodes.append(old_node)
+            continue
+        text = old_node.text
+        position = 0
+        for match in _inline_pattern.finditer(text):
+            if match.start() > position:
+                _append_plain_text(new_nodes, text[position:match.start()])
+            kind = match.lastgroup
+            if kind == "image_url":
+                new_nodes.append(TextNode(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+            elif kind == "link_url":
+                new_nodes.append(TextNode(match.group("link_text"), TextType.LINK, match.group("link_url")))
+            elif match.group(kind) != "":
+                new_nodes.append(TextNode(match.group(kind), _delimiter_text_types[kind]))
+            position = match.end()
+        if position < len(text):
+            _append_plain_text(new_nodes, text[position:])
+    return new_nodes
+
+
+def _append_plain_text(new_nodes, text):
+    # Any delimiter left between matches has no partner
+    if "**" in text or "_" in text or "`" in text:
+        raise ValueError("invalid markdown, formatted section not closed")
+    new_nodes.append(TextNode(text, TextType.TEXT))
+
+
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
@@ -22,73 +72,40 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
         new_nodes.extend(split_nodes)
     return new_nodes
 
+_image_pattern = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_link_pattern = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def split_nodes_image(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-        original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
-            new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    TextType.IMAGE,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
-    return new_nodes
+    return _split_nodes_pattern(old_nodes, _image_pattern, TextType.IMAGE)
 
 
 def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, _link_pattern, TextType.LINK)
+
+
+def _split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
             new_nodes.append(old_node)
             continue
         original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
+        # Slice between match offsets so the text is only scanned once
+        position = 0
+        for match in pattern.finditer(original_text):
+            if match.start() > position:
+                new_nodes.append(TextNode(original_text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+        if position == 0:
             new_nodes.append(old_node)
-            continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.TEXT))
+        elif position < len(original_text):
+            new_nodes.append(TextNode(original_text[position:], TextType.TEXT))
     return new_nodes
 
 def extract_markdown_images(text):
-
-    # images
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-
-    matches = re.findall(pattern, text)
-
-    return matches
+    return _image_pattern.findall(text)
 
 def extract_markdown_links(text):
-
-    # links
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-
-    matches = re.findall(pattern, text)
-
-    return matches
\ No newline at end of file
+    return _link_pattern.findall(text)
@@ -0,0 +1,71 @@
+import os
+import re
+from htmlnode import escape_text
+
+TITLE_PLACEHOLDER = "{{ Title }}"
+CONTENT_PLACEHOLDER = "{{ Content }}"
+
+_placeholder_pattern = re.compile(f"({re.escape(TITLE_PLACEHOLDER)}|{re.escape(CONTENT_PLACEHOLDER)})")
+
+# (template_path, basepath) -> (mtime_ns, size, Template)
+_template_cache = {}
+
+
+def rewrite_basepath(html, basepath):
+    # Replace href="/ and src="/ with the specified basepath
+    if basepath == "/":
+        return html
+    html = html.replace('href="/', f'href="{basepath}')
+    return html.replace('src="/', f'src="{basepath}')
+
+
+class Template:
+    def __init__(self, source, basepath="/"):
+        # Literal markup is stored with the basepath already applied; each
+        # placeholder gets an empty slot that render() fills in.
+        self.parts = []
+        self.slots = []
+        for i, piece in enumerate(_placeholder_pattern.split(source)):
+            if i % 2 == 1:
+                self.slots.append((len(self.parts), piece))
+                self.parts.append("")
+            else:
+                self.parts.append(rewrite_basepath(piece, basepath))
+
+    def render(self, title, content):
+        # title is page text and gets escaped; content is already HTML
+        values = {TITLE_PLACEHOLDER: escape_text(title), CONTENT_PLACEHOLDER: content}
+        parts = self.parts.copy()
+        for index, placeholder in self.slots:
+            parts[index] = values[placeholder]
+        return "".join(parts)
+
+    def render_to(self, write, title, write_content):
+        # Stream the page to write(); write_content(write) is called for each
+        # content placeholder so the body never has to exist as one string
+        slots = dict(self.slots)
+        title = escape_text(title)
+        for index, part in enumerate(self.parts):
+            placeholder = slots.get(index)
+            if placeholder is None:
+                write(part)
+            elif placeholder == TITLE_PLACEHOLDER:
+                write(title)
+            else:
+                write_content(write)
+
+    def __repr__(self):
+        return f"Template({self.parts}, slots: {self.slots})"
+
+
+def load_template(template_path, basepath="/"):
+    stat = os.stat(template_path)
+    key = (template_path, basepath)
+    cached = _template_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    with open(template_path, 'r', encoding='utf-8') as template_file:
+        template = Template(template_file.read(), basepath)
+    _template_cache[key] = (stat.st_mtime_ns, stat.st_size, template)
+    return template
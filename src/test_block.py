@@ -1,6 +1,7 @@
+import io
 import unittest
 
-from blocktype import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node
+from blocktype import BlockType, block_to_block_type, iter_blocks, markdown_to_blocks, markdown_to_html_node
 
 class TestBlock(unittest.TestCase):
     def test_markdown_to_blocks_basic(self):
@@ -104,6 +105,29 @@ class TestBlock(unittest.TestCase):
             ],
         )
 
+    def test_iter_blocks_from_file_handle(self):
+        md = "# Heading\n\n\n\nParagraph one\n    continued\n\n- a\n- b\n"
+        self.assertEqual(list(iter_blocks(io.StringIO(md))), markdown_to_blocks(md))
+        self.assertEqual(
+            list(iter_blocks(io.StringIO(md))),
+            ["# Heading", "Paragraph one\ncontinued", "- a\n- b"],
+        )
+
+    def test_iter_blocks_is_lazy(self):
+        def lines():
+            yield "first block\n"
+            yield "\n"
+            raise AssertionError("read past the first block")
+
+        self.assertEqual(next(iter_blocks(lines())), "first block")
+
+    def test_markdown_to_html_node_from_file_handle(self):
+        md = "# Title\n\nSome **bold** text\n"
+        self.assertEqual(
+            markdown_to_html_node(io.StringIO(md)).to_html(),
+            markdown_to_html_node(md).to_html(),
+        )
+
     def test_heading(self):
         block = "# Heading 1"
         self.assertEqual(block_to_block_type(block), BlockType.HEADING)
@@ -139,6 +163,25 @@ class TestBlock(unittest.TestCase):
         block = "1. Only one item"
         self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
 
+    def test_ordered_list_out_of_sequence(self):
+        block = "1. First item\n3. Third item"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+        block = "2. Starts at two"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_near_misses_are_paragraphs(self):
+        for block in (
+            "####### Seven hashes",
+            "#NoSpace",
+            "```\nunterminated code",
+            "> quote\nnot quote",
+            "- item\nnot item",
+            "0. zero",
+            "1.no space",
+        ):
+            self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH, block)
+
     def test_paragraph(self):
         block = "This is a normal paragraph."
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
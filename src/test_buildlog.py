@@ -0,0 +1,65 @@
+import contextlib
+import io
+import unittest
+
+from buildlog import QUIET, SUMMARY, VERBOSE, BuildLog
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_levels_filter_messages(self):
+        for level, expected in ((QUIET, ""), (SUMMARY, "summary\n"), (VERBOSE, "detail\nsummary\n")):
+            stream = io.StringIO()
+            log = BuildLog(level, stream)
+            log.verbose("detail")
+            log.info("summary")
+            log.flush()
+            self.assertEqual(stream.getvalue(), expected)
+
+    def test_verbose_lines_are_buffered(self):
+        stream = io.StringIO()
+        log = BuildLog(VERBOSE, stream, buffer_lines=3)
+        log.verbose("one")
+        log.verbose("two")
+        self.assertEqual(stream.getvalue(), "")
+        log.verbose("three")
+        self.assertEqual(stream.getvalue(), "one\ntwo\nthree\n")
+
+    def test_error_flushes_pending_output_first(self):
+        stream = io.StringIO()
+        stderr = io.StringIO()
+        log = BuildLog(VERBOSE, stream)
+        log.verbose("before")
+        with contextlib.redirect_stderr(stderr):
+            log.error("failed")
+        self.assertEqual(stream.getvalue(), "before\n")
+        self.assertEqual(stderr.getvalue(), "failed\n")
+
+    def test_progress_only_draws_on_a_terminal(self):
+        piped = io.StringIO()
+        BuildLog(SUMMARY, piped).progress(1, 1)
+        self.assertEqual(piped.getvalue(), "")
+
+        terminal = FakeTerminal()
+        log = BuildLog(SUMMARY, terminal, progress_interval=60)
+        log.progress(1, 3)
+        log.progress(2, 3)  # throttled
+        log.progress(3, 3)
+        self.assertEqual(terminal.getvalue(), "\r1/3 pages\r3/3 pages\n")
+
+        terminal = FakeTerminal()
+        BuildLog(VERBOSE, terminal).progress(1, 1)
+        self.assertEqual(terminal.getvalue(), "")
+
+    def test_progress_reports_source_bytes(self):
+        terminal = FakeTerminal()
+        BuildLog(SUMMARY, terminal).progress(2, 2, 1_500_000, 1_500_000)
+        self.assertEqual(terminal.getvalue(), "\r2/2 pages (1.5/1.5 MB)\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+
+from copystatic import copy_file, copy_files_recursive
+from test_support import SiteFixture
+
+
+class TestCopyFilesRecursive(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.write(os.path.join(self.static, "images", "a.png"), "png")
+
+    def sync(self, **kwargs):
+        return copy_files_recursive(self.static, self.public, **kwargs)
+
+    def test_first_sync_copies_everything(self):
+        result = self.sync()
+        self.assertEqual(result[:3], (2, 2, 0))
+        self.assertEqual(result.bytes_copied, len("body {}") + len("png"))
+        with open(os.path.join(self.public, "images", "a.png"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "png")
+
+    def test_unchanged_files_are_not_copied(self):
+        self.sync()
+        self.assertEqual(self.sync()[:3], (2, 0, 0))
+
+    def test_changed_file_is_copied(self):
+        self.sync()
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.assertEqual(self.sync()[:3], (2, 1, 0))
+
+    def test_touched_file_with_same_bytes_is_skipped_with_hash(self):
+        self.sync()
+        path = os.path.join(self.static, "index.css")
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.sync(use_hash=True)[:3], (2, 0, 0))
+        self.assertEqual(os.stat(os.path.join(self.public, "index.css")).st_mtime_ns, stat.st_mtime_ns + 1_000_000_000)
+
+    def test_removed_source_is_pruned(self):
+        self.sync()
+        os.remove(os.path.join(self.static, "images", "a.png"))
+        self.assertEqual(self.sync()[:3], (1, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images")))
+
+    def test_unrelated_output_files_are_kept(self):
+        self.sync()
+        self.write(os.path.join(self.public, "index.html"), "generated page")
+        self.sync()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_link_mode_hardlinks(self):
+        self.sync(link=True)
+        source = os.stat(os.path.join(self.static, "index.css"))
+        output = os.stat(os.path.join(self.public, "index.css"))
+        self.assertEqual(source.st_ino, output.st_ino)
+
+    def test_copy_over_hardlink_keeps_source(self):
+        self.sync(link=True)
+        source = os.path.join(self.static, "index.css")
+        output = os.path.join(self.public, "index.css")
+        # An in-place edit changes both names of the hardlinked file
+        self.write(source, "body { color: red }")
+        copy_file(source, output)
+        with open(source, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body { color: red }")
+        with open(output, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body { color: red }")
+        self.assertNotEqual(os.stat(source).st_ino, os.stat(output).st_ino)
+        self.assertEqual(sorted(os.listdir(self.public)), [".static-manifest.json", "images", "index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
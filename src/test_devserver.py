@@ -0,0 +1,95 @@
+import contextlib
+import io
+import os
+import unittest
+
+from devserver import SiteWatcher
+from manifest import STATIC_MANIFEST_FILENAME, load_manifest
+from test_support import SiteFixture
+
+
+class TestSiteWatcher(SiteFixture, unittest.TestCase):
+    template_text = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public)
+
+    def read(self, *parts):
+        with open(os.path.join(self.public, *parts), encoding="utf-8") as f:
+            return f.read()
+
+    def poll(self):
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            return self.watcher.poll()
+
+    def test_no_changes(self):
+        self.assertEqual(self.poll(), [])
+
+    def test_edited_page_is_rebuilt_alone(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        touched = self.poll()
+        self.assertEqual(touched, [os.path.join(self.public, "blog", "post.html")])
+        self.assertIn("<title>Edited</title>", self.read("blog", "post.html"))
+
+    def test_template_change_rebuilds_all_pages(self):
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.poll()), 2)
+        self.assertTrue(self.read("index.html").startswith("<h1>Home</h1>"))
+
+    def test_static_files_are_synced(self):
+        self.write(os.path.join(self.static, "style.css"), "body {}")
+        self.poll()
+        self.assertEqual(self.read("style.css"), "body {}")
+        os.remove(os.path.join(self.static, "style.css"))
+        self.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "style.css")))
+
+    def test_removed_page_output_is_deleted(self):
+        self.write(os.path.join(self.content, "new.md"), "# New")
+        self.poll()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "new.html")))
+        os.remove(os.path.join(self.content, "new.md"))
+        self.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "new.html")))
+
+    def test_manifests_follow_the_watcher(self):
+        new = os.path.join(self.content, "new.md")
+        self.write(new, "# New")
+        self.write(os.path.join(self.static, "style.css"), "body {}")
+        self.poll()
+        self.assertEqual(load_manifest(self.public)["pages"][new]["dest"], os.path.join(self.public, "new.html"))
+        self.assertEqual(load_manifest(self.public, STATIC_MANIFEST_FILENAME)["files"], ["style.css"])
+        os.remove(new)
+        os.remove(os.path.join(self.static, "style.css"))
+        self.poll()
+        self.assertNotIn(new, load_manifest(self.public)["pages"])
+        self.assertEqual(load_manifest(self.public, STATIC_MANIFEST_FILENAME)["files"], [])
+
+    def test_removed_page_prunes_empty_dirs(self):
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        self.poll()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+    def test_broken_page_does_not_stop_watching(self):
+        self.write(os.path.join(self.content, "index.md"), "no title yet")
+        self.assertEqual(self.poll(), [])
+        self.write(os.path.join(self.content, "index.md"), "# Fixed")
+        self.assertEqual(self.poll(), [os.path.join(self.public, "index.html")])
+
+    def test_unchanged_blocks_reuse_cached_nodes(self):
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nShared paragraph")
+        self.poll()
+        node = self.watcher.block_cache[("/", "Shared paragraph")]
+        self.write(os.path.join(self.content, "index.md"), "# Home again\n\nShared paragraph")
+        self.poll()
+        self.assertIs(self.watcher.block_cache[("/", "Shared paragraph")], node)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import mmap
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from blocktype import markdown_to_html_node
+from document import MappedDocument, StreamedDocument, load_document, parse_document
+
+
+class TestDocument(unittest.TestCase):
+    def test_title_from_first_h1_block(self):
+        md = "## Subtitle\n\n```\n# not a title\n```\n\n# Real **title**\n\n# Second title"
+        document = parse_document(md)
+        self.assertEqual(document.title, "Real **title**")
+        self.assertEqual(document.node.to_html(), markdown_to_html_node(md).to_html())
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            parse_document("no title here\n\n## only an h2")
+
+    def test_basepath_applies_to_node(self):
+        document = parse_document("# Home\n\n[About](/about)", basepath="/site/")
+        self.assertIn('href="/site/about"', document.node.to_html())
+
+    def test_links_and_text_are_only_collected_on_request(self):
+        md = "# Home\n\n[About](/about) and [again](/about)"
+        document = parse_document(md)
+        self.assertEqual((document.links, document.text), ((), ()))
+        document = parse_document(md, collect_links=True, collect_text=True)
+        self.assertEqual(document.links, ["/about"])
+        self.assertEqual(document.text, ["Home", "About and again"])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(md)
+            cases = [({}, ((), ())), ({"collect_links": True, "collect_text": True}, (document.links, document.text))]
+            for kwargs, expected in cases:
+                with MappedDocument(path, **kwargs) as mapped:
+                    mapped.render_to(lambda chunk: None)
+                    self.assertEqual((mapped.links, mapped.text), expected)
+
+    def test_streamed_document_matches_parsed_document(self):
+        md = "Intro\n\n# Title\n\n- one\n- [two](/two)\n\n\n```\ncode\n```\n\n> [quote](/two)"
+        expected = parse_document(md, basepath="/site/", collect_links=True, collect_text=True)
+        document = StreamedDocument(md, basepath="/site/", collect_links=True, collect_text=True)
+        chunks = []
+        document.render_to(chunks.append)
+        self.assertEqual(document.title, expected.title)
+        self.assertEqual("".join(chunks), expected.node.to_html())
+        self.assertEqual((document.links, document.text), (expected.links, expected.text))
+
+    def test_load_document_is_memoized_until_source_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# First")
+            self.assertIsNot(load_document(path), load_document(path))
+
+            documents = {}
+            first = load_document(path, documents=documents)
+            self.assertIs(load_document(path, documents=documents), first)
+            self.assertIsNot(load_document(path, basepath="/site/", documents=documents), first)
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("# Second version")
+            self.assertEqual(load_document(path, documents=documents).title, "Second version")
+
+    def test_mapped_document_matches_parsed_document(self):
+        md = "Intro\r\n\r\n# Title\r\n\r\n- one\r\n- two\r\n\r\n\r\n```\r\ncode\r\n```\r\n\r\n> quote\rline"
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(md)
+            with open(path, encoding="utf-8") as f:
+                expected = parse_document(f.read(), basepath="/site/")
+            with MappedDocument(path, basepath="/site/") as document:
+                chunks = []
+                document.render_to(chunks.append)
+                self.assertEqual(document.title, expected.title)
+                self.assertEqual("".join(chunks), expected.node.to_html())
+
+    def test_mapped_pages_are_released_while_reading(self):
+        md = "# Title\r\n\r\n" + "\r\n\r\n".join(f"Paragraph **{i}** with [a link](/{i})" for i in range(2000))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.md")
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(md)
+            with mock.patch("document.release_mapped_bytes", mmap.PAGESIZE), MappedDocument(path) as document:
+                chunks = []
+                document.render_to(chunks.append)
+                # Rendering twice reads released pages back from the file
+                document.render_to(chunks.append)
+            with open(path, encoding="utf-8") as f:
+                expected = parse_document(f.read()).node.to_html()
+            self.assertEqual("".join(chunks), expected * 2)
+
+    def test_mapped_empty_document_has_no_title(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "empty.md")
+            open(path, "w").close()
+            with self.assertRaises(ValueError):
+                MappedDocument(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
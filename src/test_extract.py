@@ -1,5 +1,5 @@
 import unittest
-from extract_tag import extract_title
+from document import parse_document
 from splitnode import extract_markdown_images, extract_markdown_links
 
 class TestExtract(unittest.TestCase):
@@ -19,40 +19,47 @@ class TestExtract(unittest.TestCase):
 
         self.assertListEqual([("to boot dev", "https://www.boot.dev"), ("to youtube", "https://www.youtube.com/@bootdotdev")], matches)
 
+    def title(self, markdown):
+        return parse_document(markdown).title
+
     def test_single_h1_header(self):
-        self.assertEqual(extract_title("# Hello"), "Hello")
+        self.assertEqual(self.title("# Hello"), "Hello")
 
     def test_h1_with_extra_spaces(self):
-        self.assertEqual(extract_title("#   Hello World   "), "Hello World")
+        self.assertEqual(self.title("#   Hello World   "), "Hello World")
 
     def test_multiple_lines_with_h1(self):
-        markdown = "Random text\n# Header 1\n## Header 2"
-        self.assertEqual(extract_title(markdown), "Header 1")
+        markdown = "Random text\n\n# Header 1\n\n## Header 2"
+        self.assertEqual(self.title(markdown), "Header 1")
 
     def test_no_h1_header(self):
         with self.assertRaises(ValueError):
-            extract_title("Random text\n## Header 2")
+            self.title("Random text\n\n## Header 2")
 
     def test_empty_string(self):
         with self.assertRaises(ValueError):
-            extract_title("")
+            self.title("")
 
     def test_h1_not_at_start_of_line(self):
         with self.assertRaises(ValueError):
-            extract_title("Text before # H1 Header")
+            self.title("Text before # H1 Header")
+
+    def test_h1_inside_code_block_is_not_a_title(self):
+        with self.assertRaises(ValueError):
+            self.title("```\n# not a title\n```")
 
     def test_multiple_h1_headers(self):
-        markdown = "# First H1\n# Second H1"
-        self.assertEqual(extract_title(markdown), "First H1")
+        markdown = "# First H1\n\n# Second H1"
+        self.assertEqual(self.title(markdown), "First H1")
 
     def test_only_h1_header(self):
-        self.assertEqual(extract_title("# H1 Only"), "H1 Only")
+        self.assertEqual(self.title("# H1 Only"), "H1 Only")
 
     def test_h1_header_with_special_characters(self):
-        self.assertEqual(extract_title("# @Header-123!"), "@Header-123!")
+        self.assertEqual(self.title("# @Header-123!"), "@Header-123!")
 
     def test_h1_header_with_markdown_formatting(self):
-        self.assertEqual(extract_title("# **Bold Header**"), "**Bold Header**")
+        self.assertEqual(self.title("# **Bold Header**"), "**Bold Header**")
 
     if __name__ == "__main__":
         unittest.main()
\ No newline at end of file
@@ -1,24 +1,31 @@
+import contextlib
+import io
+import os
+import tempfile
 import unittest
+from unittest import mock
 
-from gencontent import extract_title
+from document import parse_document
+from gencontent import PageGenerationError, PageWriter, PlannedPage, generate_pages_incremental, plan_build, schedule
+from test_support import SiteFixture
 
-class TestExtractTitle(unittest.TestCase):
+class TestPageTitle(unittest.TestCase):
     def test_eq(self):
-        actual = extract_title("# Hello")
+        actual = parse_document("# Hello").title
         self.assertEqual(actual, "Hello")
 
     def test_eq_double(self):
-        actual = extract_title(
+        actual = parse_document(
             """
 # This is a title
     
 # This is a second title that should be ignored
 """
-        )
+        ).title
         self.assertEqual(actual, "This is a title")
 
     def test_eq_long(self):
-        actual = extract_title(
+        actual = parse_document(
             """
 # title
 
@@ -30,12 +37,12 @@ of text
 - a
 - list  
 """
-        )
+        ).title
         self.assertEqual(actual, "title")
 
     def test_no_title(self):
         try:
-            extract_title(
+            parse_document(
                 """
 no title here
                 """
@@ -44,5 +51,202 @@ no title here
         except Exception as e:
             pass
 
+    def test_code_block_is_not_a_title(self):
+        actual = parse_document(
+            """
+```
+# not a title
+```
+
+# title
+"""
+        ).title
+        self.assertEqual(actual, "title")
+
+class TestIncrementalBuild(SiteFixture, unittest.TestCase):
+    template_text = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+
+    def build(self, basepath="/", jobs=1, force=False):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_incremental(self.content, self.template, self.public, basepath, jobs, force=force)
+
+    def read_outputs(self):
+        outputs = {}
+        for dirpath, _, filenames in os.walk(self.public):
+            for filename in filenames:
+                if filename.endswith(".html"):
+                    with open(os.path.join(dirpath, filename), "rb") as f:
+                        outputs[os.path.relpath(os.path.join(dirpath, filename), self.public)] = f.read()
+        return outputs
+
+    def test_first_build_generates_everything(self):
+        self.assertEqual(self.build(), (2, 2, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+
+    def test_unchanged_build_generates_nothing(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 0, 0))
+
+    def test_only_changed_page_is_rebuilt(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited post")
+        self.assertEqual(self.build(), (1, 1, 0))
+        with open(os.path.join(self.public, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertIn("Edited post", f.read())
+
+    def test_template_or_basepath_change_rebuilds_everything(self):
+        self.build()
+        self.assertEqual(self.build("/site/"), (2, 0, 0))
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self.build("/site/"), (2, 2, 0))
+
+    def test_basepath_applies_to_links_but_not_code(self):
+        self.write(self.template, '<a href="/">{{ Title }}</a>{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"),
+                   '# Home\n\n[About](/about) ![logo](/logo.png) [ext](https://x.org/)\n\n```\n<a href="/keep">\n```')
+        self.build("/site/")
+        with open(os.path.join(self.public, "index.html"), encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn('<a href="/site/">Home</a>', html)
+        self.assertIn('<a href="/site/about">About</a>', html)
+        self.assertIn('<img src="/site/logo.png" alt="logo"></img>', html)
+        self.assertIn('<a href="https://x.org/">ext</a>', html)
+        self.assertIn('&lt;a href="/keep"&gt;', html)
+
+    def test_forced_build_only_writes_changed_output(self):
+        self.build()
+        index = os.path.join(self.public, "index.html")
+        os.utime(index, ns=(0, 0))
+        self.assertEqual(self.build(force=True), (2, 0, 0))
+        self.assertEqual(os.stat(index).st_mtime_ns, 0)
+
+        self.write(self.template, "<title>{{ Title }}!</title>{{ Content }}")
+        self.assertEqual(self.build(force=True), (2, 2, 0))
+        self.assertNotEqual(os.stat(index).st_mtime_ns, 0)
+
+    def test_parser_change_rebuilds_everything(self):
+        self.build()
+        with mock.patch("gencontent.parser_version", return_value="new parser"):
+            self.assertEqual(self.build(), (2, 0, 0))
+
+    def test_removed_source_deletes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.assertEqual(self.build(), (0, 0, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog")))
+
+
+    def test_parallel_build_matches_serial_build(self):
+        for i in range(8):
+            self.write(os.path.join(self.content, "blog", f"post{i}.md"), f"# Post {i}\n\nSome **bold** [link](/x{i})")
+        self.build(jobs=1)
+        serial = self.read_outputs()
+        self.build(basepath="/site/", jobs=1)
+        self.assertEqual(self.build(jobs=4), (10, 8, 0))
+        self.assertEqual(self.read_outputs(), serial)
+
+    def test_memory_mapped_build_matches_normal_build(self):
+        self.write(os.path.join(self.content, "blog", "long.md"), "# Long\n\n" + "\n\n".join(f"Para **{i}**" for i in range(100)))
+        self.build()
+        expected = self.read_outputs()
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.public, "/site/", mmap_threshold=0)
+            generate_pages_incremental(self.content, self.template, self.public, "/", mmap_threshold=0)
+        self.assertEqual(self.read_outputs(), expected)
+
+    def test_pages_are_streamed_without_a_node_tree(self):
+        with mock.patch("gencontent.load_document", side_effect=AssertionError("whole page parsed")):
+            self.assertEqual(self.build(), (2, 2, 0))
+        with open(os.path.join(self.public, "blog", "post.html"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<title>Post</title><div><h1>Post</h1></div>")
+
+    def test_page_errors_report_source_path(self):
+        broken = os.path.join(self.content, "blog", "broken.md")
+        self.write(broken, "no title here")
+        for jobs in (1, 2):
+            with self.assertRaises(PageGenerationError) as context:
+                self.build(jobs=jobs)
+            self.assertEqual([path for path, _ in context.exception.failures], [broken])
+            self.assertIn(broken, str(context.exception))
+        # Only the failed page is retried once it is fixed
+        self.write(broken, "# Fixed")
+        self.assertEqual(self.build(), (1, 1, 0))
+
+    def test_interrupted_write_keeps_previous_page(self):
+        self.build()
+        post = os.path.join(self.public, "blog", "post.html")
+        with open(post, encoding="utf-8") as f:
+            previous = f.read()
+
+        def fail_midway(document, write):
+            write("<p>half a page")
+            raise KeyboardInterrupt
+
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Edited post")
+        with mock.patch("document.StreamedDocument.render_to", fail_midway), self.assertRaises(KeyboardInterrupt):
+            self.build()
+        with open(post, encoding="utf-8") as f:
+            self.assertEqual(f.read(), previous)
+        self.assertEqual(os.listdir(os.path.dirname(post)), ["post.html"])
+
+
+
+class TestBuildPlan(unittest.TestCase):
+    def test_plan_is_sorted_and_carries_stat_data(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            for rel_path in ("b.md", "a/z.md", "a/b/c.md", "c.md"):
+                os.makedirs(os.path.dirname(os.path.join(content, rel_path)), exist_ok=True)
+                with open(os.path.join(content, rel_path), "w", encoding="utf-8") as f:
+                    f.write(rel_path)
+            plan = plan_build(content, "public")
+        self.assertEqual([os.path.relpath(page.source, content) for page in plan],
+                         [os.path.join("a", "b", "c.md"), os.path.join("a", "z.md"), "b.md", "c.md"])
+        self.assertEqual(plan[0].dest, os.path.join("public", "a", "b", "c.html"))
+        self.assertEqual([page.size for page in plan], [8, 6, 4, 4])
+
+    def test_schedule_spreads_large_pages_across_chunks(self):
+        plan = [PlannedPage(f"{i}.md", f"{i}.html", size, 0) for i, size in enumerate([1, 9, 2, 8, 3, 7, 4, 6] * 4)]
+        self.assertEqual(schedule(plan, 1), [plan])
+        chunks = schedule(plan, 2)
+        self.assertEqual(len(chunks), 8)
+        self.assertEqual(sorted(page for chunk in chunks for page in chunk), sorted(plan))
+        self.assertEqual(chunks[0][0].size, 9)
+        self.assertEqual({sum(page.size for page in chunk) for chunk in chunks}, {20})
+
+
+class TestPageWriter(unittest.TestCase):
+    def write_page(self, path, chunks):
+        writer = PageWriter(path)
+        for chunk in chunks:
+            writer.write(chunk)
+        return writer.close()
+
+    def test_only_different_output_is_written(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "page.html")
+            self.assertTrue(self.write_page(path, ["<p>", "caf\u00e9", "</p>"]))
+            self.assertFalse(self.write_page(path, ["<p>caf\u00e9", "</p>"]))
+            for chunks in (["<p>caf\u00e9</p>", "<p>more</p>"], ["<p>caf\u00e9</p>"], ["<p>", "tea", "</p>"]):
+                self.assertTrue(self.write_page(path, chunks))
+                with open(path, encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "".join(chunks))
+            self.assertEqual(os.listdir(tmp), ["page.html"])
+
+    def test_unfinished_page_has_a_hidden_name(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = PageWriter(os.path.join(tmp, "index.html"))
+            writer.write("<p>half a page")
+            # What a killed build would leave behind is never published as a page
+            self.assertEqual(os.listdir(tmp), [".index.html.tmp"])
+            writer.abort()
+            self.assertEqual(os.listdir(tmp), [])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode
+from htmlnode import HTMLNode, LeafNode, ParentNode, RawNode
 
 class TestHTMLNode(unittest.TestCase):
     def test_no_prop(self):
@@ -39,6 +39,13 @@ class TestHTMLNode(unittest.TestCase):
         expected_output = ' href="https://example.com?foo=bar&baz=qux"'
         self.assertEqual(node.props_to_html(), expected_output)
 
+    def test_leaf_writes_escaped_value_as_is(self):
+        # Escaping happens once, when text_node_to_html_node builds the leaf
+        self.assertEqual(LeafNode("code", "&lt;div&gt;").to_html(), "<code>&lt;div&gt;</code>")
+
+    def test_raw_node_is_not_escaped(self):
+        self.assertEqual(RawNode("<p>a &amp; b</p>").to_html(), "<p>a &amp; b</p>")
+
     def test_multiple_children(self):
         child1 = HTMLNode(tag="span", value="Child 1")
         child2 = HTMLNode(tag="span", value="Child 2")
@@ -105,6 +112,37 @@ class TestHTMLNode(unittest.TestCase):
         html_node = ParentNode(tag="section", children=["Some content"])
         self.assertIsInstance(html_node, HTMLNode)
 
+    def test_compact_nodes(self):
+        leaf = LeafNode("b", "Bold")
+        parent = ParentNode("p", [leaf])
+        for node in (leaf, parent, HTMLNode("p", "text")):
+            self.assertFalse(hasattr(node, "__dict__"))
+        self.assertIsNone(leaf.children)
+        self.assertIsNone(parent.value)
+        self.assertEqual(repr(parent), "ParentNode(p, children: [LeafNode(b, Bold, None)], None)")
+
+    def test_render_to_streams_fragments(self):
+        parent = ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")], {"class": "x"})
+        chunks = []
+        parent.render_to(chunks.append)
+        self.assertEqual(chunks, ['<p class="x">', "<b>Bold</b>", " text", "</p>"])
+        self.assertEqual("".join(chunks), parent.to_html())
+
+    def test_to_html_deeply_nested(self):
+        node = LeafNode("span", "core")
+        for _ in range(200):
+            node = ParentNode("div", [node])
+        self.assertEqual(node.to_html(), "<div>" * 200 + "<span>core</span>" + "</div>" * 200)
+
+    def test_render_to_missing_tag(self):
+        parent = ParentNode("div", [ParentNode(None, [LeafNode("b", "x")])])
+        with self.assertRaises(ValueError):
+            parent.to_html()
+
+    def test_htmlnode_render_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "text").to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
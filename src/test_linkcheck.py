@@ -0,0 +1,81 @@
+import contextlib
+import io
+import os
+import unittest
+
+from blocktype import block_to_html_node
+from gencontent import generate_pages_incremental
+from linkcheck import check_links, find_broken_links, resolve_link
+from manifest import load_manifest
+from rendercache import RenderCache
+from test_support import SiteFixture
+
+
+class TestLinkCheck(SiteFixture, unittest.TestCase):
+    def test_resolve_link(self):
+        self.assertEqual(resolve_link("/images/a.png", "blog/tom"), "images/a.png")
+        self.assertEqual(resolve_link("/", "blog/tom"), "")
+        self.assertEqual(resolve_link("../glorfindel#intro", "blog/tom"), "blog/glorfindel")
+        self.assertEqual(resolve_link("photo%20one.png?size=2", "blog"), "blog/photo one.png")
+        self.assertIsNone(resolve_link("https://www.boot.dev", ""))
+        self.assertIsNone(resolve_link("mailto:me@example.com", ""))
+        self.assertIsNone(resolve_link("//cdn.example.com/a.js", ""))
+        self.assertIsNone(resolve_link("#top", "blog"))
+
+    def test_find_broken_links(self):
+        pages = {
+            "content/index.md": {"dest": "public/index.html", "links": ["/blog/tom", "/images/a.png", "/missing"]},
+            "content/blog/tom/index.md": {"dest": "public/blog/tom/index.html", "links": ["/", "../gone", "https://x.org"]},
+        }
+        checked, broken = find_broken_links("public", pages, ["images/a.png"])
+        self.assertEqual(checked, 6)
+        self.assertEqual(broken, [("content/index.md", "/missing"), ("content/blog/tom/index.md", "../gone")])
+
+    def test_links_are_collected_from_cached_blocks(self):
+        block = "A paragraph with a [link](/about) and an ![image](/a.png) that is long enough to cache."
+        cache = {}
+        first, second = [], []
+        block_to_html_node(block, cache, links=first)
+        block_to_html_node(block, cache, links=second)
+        self.assertEqual(first, ["/about", "/a.png"])
+        self.assertEqual(second, first)
+
+    def test_check_links_after_incremental_build(self):
+        paragraph = "Read the [post](/blog/post) and [missing page](/nope) with enough text to be cached."
+        self.write(os.path.join(self.content, "index.md"), f"# Home\n\n{paragraph}")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n[home](/)")
+
+        cache = RenderCache(os.path.join(self.root, "cache"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.public, "/site/", cache=cache, collect_links=True)
+        expected = (3, [(os.path.join(self.content, "index.md"), "/nope")])
+        self.assertEqual(check_links(self.public), expected)
+
+        # Unchanged pages keep their recorded links; cache hits still report theirs
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post again\n\n[home](/)")
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.public, "/site/", cache=cache, collect_links=True)
+            generate_pages_incremental(self.content, self.template, self.public, "/",
+                                       cache=RenderCache(os.path.join(self.root, "cache")), collect_links=True)
+        self.assertEqual(check_links(self.public), expected)
+        # Blocks cached by the /site/ build are rendered again for /
+        with open(os.path.join(self.public, "index.html"), encoding="utf-8") as f:
+            html = f.read()
+        self.assertIn('<a href="/blog/post">post</a>', html)
+        self.assertNotIn("/site/", html)
+
+    def test_links_are_only_recorded_when_collected(self):
+        index = os.path.join(self.content, "index.md")
+        self.write(index, "# Home\n\n[a](/nope) [b](/nope)\n\n[c](/nope) [home](/)")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_incremental(self.content, self.template, self.public, "/")
+            self.assertNotIn("links", load_manifest(self.public)["pages"][index])
+            # Pages built without links are rebuilt once links are wanted
+            counts = generate_pages_incremental(self.content, self.template, self.public, "/", collect_links=True)
+        self.assertEqual(counts.generated, 1)
+        self.assertEqual(load_manifest(self.public)["pages"][index]["links"], ["/nope", "/"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from gencontent import generate_pages_incremental
+from profiler import PAGE_STAGES, BuildProfiler, PageProfile
+from test_support import SiteFixture
+
+
+class TestProfiler(SiteFixture, unittest.TestCase):
+    def test_page_profile_records_stages(self):
+        page = PageProfile("a.md")
+        with page.stage("read"):
+            data = [object() for _ in range(100)]
+        with page.stage("render"):
+            pass
+        self.assertEqual([stage[0] for stage in page.stages], ["read", "render"])
+        self.assertGreaterEqual(page.stages[0][3], 100)
+        self.assertEqual(page.total_ns, page.stages[0][2] + page.stages[1][2])
+        del data
+
+    def test_report_lists_slowest_pages_first(self):
+        profiler = BuildProfiler()
+        for path, duration in (("fast.md", 1_000), ("slow.md", 5_000_000), ("medium.md", 2_000_000)):
+            page = PageProfile(path)
+            page.stages.append(("inline parse", 0, duration, 0))
+            profiler.add(page)
+        report = profiler.report(top=2)
+        self.assertLess(report.index("slow.md"), report.index("medium.md"))
+        self.assertNotIn("fast.md", report)
+        self.assertEqual(profiler.stage_totals()["inline parse"], (7_001_000, 0))
+
+    def test_build_collects_every_stage_and_writes_trace(self):
+        for name in ("a", "b"):
+            self.write(os.path.join(self.content, f"{name}.md"), f"# {name}\n\nSome **text**")
+
+        profiler = BuildProfiler()
+        with contextlib.redirect_stdout(io.StringIO()):
+            with profiler.stage("pages"):
+                generate_pages_incremental(self.content, self.template, self.public, "/", profiler=profiler)
+
+        self.assertEqual(sorted(page.path for page in profiler.pages),
+                         [os.path.join(self.content, "a.md"), os.path.join(self.content, "b.md")])
+        for page in profiler.pages:
+            self.assertEqual(tuple(stage[0] for stage in page.stages), PAGE_STAGES)
+
+        trace_path = os.path.join(self.root, "trace.json")
+        profiler.write_trace(trace_path)
+        with open(trace_path, encoding="utf-8") as f:
+            events = json.load(f)["traceEvents"]
+        self.assertEqual(len(events), 1 + 2 * (1 + len(PAGE_STAGES)))
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+
+
+if __name__ == "__main__":
+    unittest.main()
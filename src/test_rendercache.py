@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from blocktype import block_to_html_node, markdown_to_html_node
+from htmlnode import RawNode
+from rendercache import RenderCache
+
+PARAGRAPH = "This is a **shared** footer paragraph with a [link](/about) that is long enough to cache."
+KEY = ("/", PARAGRAPH)
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_block_renders_identically(self):
+        cache = RenderCache(self.cache_dir)
+        first = block_to_html_node(PARAGRAPH, cache)
+        # A new instance has an empty memory layer, so this reads from disk
+        second = block_to_html_node(PARAGRAPH, RenderCache(self.cache_dir))
+        self.assertIsInstance(second, RawNode)
+        self.assertEqual(second.to_html(), first.to_html())
+
+    def test_page_output_unchanged_with_cache(self):
+        md = f"# Title\n\n{PARAGRAPH}\n\n- a list item\n- another\n\n{PARAGRAPH}"
+        expected = markdown_to_html_node(md).to_html()
+        cache = RenderCache(self.cache_dir)
+        self.assertEqual(markdown_to_html_node(md, cache).to_html(), expected)
+        self.assertEqual(markdown_to_html_node(md, RenderCache(self.cache_dir)).to_html(), expected)
+
+    def test_small_blocks_are_not_cached(self):
+        cache = RenderCache(self.cache_dir)
+        block_to_html_node("# Tiny", cache)
+        self.assertIsNone(RenderCache(self.cache_dir).get(("/", "# Tiny")))
+
+    def test_parser_version_change_invalidates(self):
+        block_to_html_node(PARAGRAPH, RenderCache(self.cache_dir))
+        self.assertIsNotNone(RenderCache(self.cache_dir).get(KEY))
+        with mock.patch("rendercache.parser_version", return_value="new parser"):
+            self.assertIsNone(RenderCache(self.cache_dir).get(KEY))
+
+    def test_invalidation_only_removes_cache_entries(self):
+        block_to_html_node(PARAGRAPH, RenderCache(self.cache_dir))
+        notes = os.path.join(self.cache_dir, "notes.txt")
+        with open(notes, "w", encoding="utf-8") as f:
+            f.write("keep me")
+        with mock.patch("rendercache.parser_version", return_value="new parser"):
+            cache = RenderCache(self.cache_dir)
+            self.assertIsNone(cache.get(KEY))
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ["VERSION", "notes.txt"])
+
+    def test_refuses_non_empty_directory_without_version(self):
+        os.makedirs(self.cache_dir)
+        notes = os.path.join(self.cache_dir, "notes.txt")
+        with open(notes, "w", encoding="utf-8") as f:
+            f.write("keep me")
+        with self.assertRaises(ValueError):
+            RenderCache(self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), ["notes.txt"])
+        # An existing empty directory is fine
+        os.remove(notes)
+        RenderCache(self.cache_dir)
+        self.assertEqual(os.listdir(self.cache_dir), ["VERSION"])
+
+    def test_basepath_is_part_of_the_key(self):
+        site = block_to_html_node(PARAGRAPH, RenderCache(self.cache_dir), basepath="/site/").to_html()
+        # The same cache must not serve /site/ links to a / render
+        root = block_to_html_node(PARAGRAPH, RenderCache(self.cache_dir)).to_html()
+        self.assertIn('href="/about"', root)
+        self.assertIn('href="/site/about"', site)
+        cached = RenderCache(self.cache_dir).get(("/site/", PARAGRAPH))
+        self.assertEqual(cached.to_html(), site)
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = RenderCache(self.cache_dir)
+        blocks = [("/", f"{PARAGRAPH} number {i}") for i in range(3)]
+        for i, key in enumerate(blocks):
+            block_to_html_node(key[1], cache)
+            path = cache._entry_path(key)
+            os.utime(path, ns=(i * 1_000_000_000, i * 1_000_000_000))
+        entry_size = os.path.getsize(cache._entry_path(blocks[0]))
+
+        cache.max_bytes = entry_size * 2
+        self.assertEqual(cache.prune()[0], 2)
+        fresh = RenderCache(self.cache_dir)
+        self.assertIsNone(fresh.get(blocks[0]))
+        self.assertIsNotNone(fresh.get(blocks[2]))
+
+    def test_prune_only_evicts_cache_entries(self):
+        cache = RenderCache(self.cache_dir)
+        block_to_html_node(PARAGRAPH, cache)
+        # Older than any entry, and in a directory with a nested one
+        notes = os.path.join(self.cache_dir, "notes")
+        os.makedirs(os.path.join(notes, "sub"))
+        keep = os.path.join(notes, "keep.txt")
+        with open(keep, "w", encoding="utf-8") as f:
+            f.write("keep me")
+        os.utime(keep, ns=(0, 0))
+        # A stray directory inside a shard isn't an entry either
+        os.makedirs(os.path.join(os.path.dirname(cache._entry_path(KEY)), "stray"))
+
+        cache.max_bytes = 0
+        self.assertEqual(cache.prune(), (0, 0))
+        self.assertIsNone(RenderCache(self.cache_dir).get(KEY))
+        self.assertTrue(os.path.exists(keep))
+
+
+if __name__ == "__main__":
+    unittest.main()
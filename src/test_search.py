@@ -0,0 +1,103 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from gencontent import generate_pages_incremental
+from search import SEARCH_DIRNAME, SearchIndex, shard_filename, shard_postings, term_shard
+from test_support import SiteFixture
+
+
+class TestPostings(unittest.TestCase):
+    def test_positions_follow_reading_order(self):
+        postings = shard_postings(["The cat", "sat on the Mat!"], shards=1)
+        self.assertEqual(postings, {0: {"the": [0, 4], "cat": [1], "sat": [2], "on": [3], "mat": [5]}})
+
+    def test_terms_are_grouped_by_shard(self):
+        postings = shard_postings(["alpha beta gamma delta"], shards=4)
+        for shard, terms in postings.items():
+            for term in terms:
+                self.assertEqual(term_shard(term, 4), shard)
+
+    def test_term_shard_is_fnv1a(self):
+        self.assertEqual(term_shard("a", 1 << 32), 0xE40C292C)
+
+
+class TestSearchIndex(SiteFixture, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome to the **hobbit** site")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n- second breakfast\n- hobbit")
+
+    def build(self, search_shards=8, jobs=1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_incremental(self.content, self.template, self.public, "/site/", jobs,
+                                              search_shards=search_shards)
+
+    def read_index(self):
+        search_dir = os.path.join(self.public, SEARCH_DIRNAME)
+        with open(os.path.join(search_dir, "pages.json"), encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        terms = {}
+        for filename in os.listdir(search_dir):
+            if filename.startswith("terms-"):
+                with open(os.path.join(search_dir, filename), encoding="utf-8") as f:
+                    terms.update(json.load(f))
+        return pages, terms
+
+    def page_id(self, pages, url):
+        return next(page_id for page_id, (page_url, _) in pages.items() if page_url == url)
+
+    def test_index_lists_pages_and_positions(self):
+        self.build(jobs=2)
+        pages, terms = self.read_index()
+        self.assertEqual(sorted(pages.values()), [["/site/", "Home"], ["/site/blog/post.html", "Post"]])
+        home = self.page_id(pages, "/site/")
+        post = self.page_id(pages, "/site/blog/post.html")
+        self.assertEqual(terms["hobbit"], {home: [4], post: [3]})
+        self.assertEqual(terms["breakfast"], {post: [2]})
+
+    def test_only_changed_pages_are_reindexed(self):
+        self.build()
+        pages, _ = self.read_index()
+        home = self.page_id(pages, "/site/")
+
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nElevenses")
+        self.assertEqual(self.build(), (1, 1, 0))
+        pages, terms = self.read_index()
+        self.assertEqual(self.page_id(pages, "/site/"), home)
+        self.assertNotIn("breakfast", terms)
+        self.assertEqual(terms["hobbit"], {home: [4]})
+        self.assertEqual(list(terms["elevenses"]), [self.page_id(pages, "/site/blog/post.html")])
+
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.build()
+        pages, terms = self.read_index()
+        self.assertEqual(list(pages), [home])
+        self.assertNotIn("elevenses", terms)
+
+    def test_unchanged_build_rewrites_no_shards(self):
+        self.build()
+        self.assertEqual(self.build(), (0, 0, 0))
+        index = SearchIndex(self.public, "/site/", 8)
+        self.assertEqual(index.commit(), 0)
+
+    def test_enabling_search_indexes_existing_pages(self):
+        self.build(search_shards=0)
+        self.assertEqual(self.build(), (2, 0, 0))
+        pages, terms = self.read_index()
+        self.assertEqual(len(pages), 2)
+        self.assertIn("welcome", terms)
+
+    def test_shard_count_change_rebuilds_index(self):
+        self.build()
+        self.build(search_shards=2)
+        search_dir = os.path.join(self.public, SEARCH_DIRNAME)
+        shard_files = sorted(name for name in os.listdir(search_dir) if name.startswith("terms-"))
+        self.assertLessEqual(len(shard_files), 2)
+        self.assertTrue(set(shard_files) <= {shard_filename(0), shard_filename(1)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from splitnode import (
-    split_nodes_delimiter, split_nodes_link, split_nodes_image
+    split_nodes_delimiter, split_nodes_link, split_nodes_image, split_nodes_inline
 )
 
 from textnode import TextNode, TextType
@@ -151,6 +151,46 @@ class TestInlineMarkdown(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_nodes_link_skips_image_with_same_text(self):
+        node = TextNode("![a](b.png) and [a](b.png)", TextType.TEXT)
+        self.assertListEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("![a](b.png) and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b.png"),
+            ],
+        )
+
+    def test_split_nodes_link_dense(self):
+        text = "".join(f"[l{i}](/p/{i}) " for i in range(500))
+        new_nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(new_nodes), 1000)
+        self.assertEqual(new_nodes[-2], TextNode("l499", TextType.LINK, "/p/499"))
+        self.assertEqual(new_nodes[-1], TextNode(" ", TextType.TEXT))
+
+    def test_split_nodes_inline_matches_chained_splits(self):
+        node = TextNode(
+            "**Bold** then ![img](/a.png), a [link](/b) and _it_ with `code`",
+            TextType.TEXT,
+        )
+        chained = split_nodes_image([node])
+        chained = split_nodes_link(chained)
+        chained = split_nodes_delimiter(chained, "**", TextType.BOLD)
+        chained = split_nodes_delimiter(chained, "_", TextType.ITALIC)
+        chained = split_nodes_delimiter(chained, "`", TextType.CODE)
+        self.assertListEqual(split_nodes_inline([node]), chained)
+
+    def test_split_nodes_inline_keeps_non_text_nodes(self):
+        nodes = [TextNode("**already bold**", TextType.BOLD), TextNode("a _b_", TextType.TEXT)]
+        self.assertListEqual(
+            split_nodes_inline(nodes),
+            [
+                TextNode("**already bold**", TextType.BOLD),
+                TextNode("a ", TextType.TEXT),
+                TextNode("b", TextType.ITALIC),
+            ],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
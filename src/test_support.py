@@ -0,0 +1,30 @@
+# Helpers shared by the test modules; not part of the site generator.
+# unittest discovery imports this module but finds no tests in it.
+import os
+import tempfile
+
+
+class SiteFixture:
+    # Mix into a TestCase (before unittest.TestCase) for a throwaway site:
+    # content/, static/, public/ and template.html under a temporary directory
+    template_text = "{{ Title }}{{ Content }}"
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        os.makedirs(self.content)
+        os.makedirs(self.static)
+        self.write(self.template, self.template_text)
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        # Make sure the change is visible even on coarse mtime filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from template import Template, load_template, rewrite_basepath
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_placeholders(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(
+            template.render("Hello", "<p>World</p>"),
+            "<title>Hello</title><body><p>World</p></body>",
+        )
+
+    def test_repeated_placeholders(self):
+        template = Template("{{ Title }}|{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render("a", "b"), "a|a|b")
+
+    def test_render_to_streams_content(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}<p>{{ Title }}</p>{{ Content }}")
+        chunks = []
+        template.render_to(chunks.append, "T", lambda write: write("<div>body</div>"))
+        self.assertEqual("".join(chunks), template.render("T", "<div>body</div>"))
+
+    def test_title_is_escaped(self):
+        template = Template("<title>{{ Title }}</title>{{ Content }}")
+        expected = "<title>Fish &amp; &lt;Chips&gt;</title><h1>Fish &amp; &lt;Chips&gt;</h1>"
+        self.assertEqual(template.render("Fish & <Chips>", "<h1>Fish &amp; &lt;Chips&gt;</h1>"), expected)
+        chunks = []
+        template.render_to(chunks.append, "Fish & <Chips>", lambda write: write("<h1>Fish &amp; &lt;Chips&gt;</h1>"))
+        self.assertEqual("".join(chunks), expected)
+
+    def test_basepath_applied_to_template_markup(self):
+        template = Template('<link href="/index.css"><img src="/logo.png">{{ Content }}', "/site/")
+        self.assertEqual(
+            template.render("t", '<a href="/x">x</a>'),
+            '<link href="/site/index.css"><img src="/site/logo.png"><a href="/x">x</a>',
+        )
+
+    def test_rewrite_basepath(self):
+        html = '<a href="/blog">b</a><img src="/a.png"><a href="https://x.com/">x</a>'
+        self.assertEqual(
+            rewrite_basepath(html, "/site/"),
+            '<a href="/site/blog">b</a><img src="/site/a.png"><a href="https://x.com/">x</a>',
+        )
+        self.assertEqual(rewrite_basepath(html, "/"), html)
+
+    def test_load_template_is_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<h1>{{ Title }}</h1>")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            self.assertIsNot(load_template(path, "/site/"), first)
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("<h2>{{ Title }}</h2>{{ Content }}")
+            self.assertEqual(load_template(path).render("t", "c"), "<h2>t</h2>c")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -56,6 +56,12 @@ class TestTextNode(unittest.TestCase):
         node2 = node  # Same instance
         self.assertEqual(node, node2)
 
+    def test_compact_representation(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = True
+
     def test_link(self):
         node = TextNode("Click here", TextType.LINK, url="https://example.com")
         html_node = text_node_to_html_node(node)
@@ -73,6 +79,25 @@ class TestTextNode(unittest.TestCase):
             "alt": "Alt text"
         })
 
+    def test_values_are_escaped(self):
+        self.assertEqual(text_node_to_html_node(TextNode("a < b && c > d", TextType.TEXT)).to_html(),
+                         "a &lt; b &amp;&amp; c &gt; d")
+        self.assertEqual(text_node_to_html_node(TextNode("<div>", TextType.CODE)).to_html(), "<code>&lt;div&gt;</code>")
+        self.assertEqual(text_node_to_html_node(TextNode('plain "quoted" text', TextType.BOLD)).to_html(),
+                         '<b>plain "quoted" text</b>')
+        node = TextNode('Say "hi" <now>', TextType.IMAGE, url="/a.png?x=1&y=2")
+        self.assertEqual(text_node_to_html_node(node).props,
+                         {"src": "/a.png?x=1&amp;y=2", "alt": "Say &quot;hi&quot; &lt;now&gt;"})
+
+    def test_link_basepath(self):
+        for url, expected in (("/blog/tom", "/site/blog/tom"), ("/", "/site/"),
+                              ("https://example.com/", "https://example.com/"),
+                              ("//cdn.example.com/a.js", "//cdn.example.com/a.js"), ("images/a.png", "images/a.png")):
+            node = TextNode("Click here", TextType.LINK, url=url)
+            self.assertEqual(text_node_to_html_node(node, "/site/").props, {"href": expected})
+        node = TextNode("Alt text", TextType.IMAGE, url="/images/a.png")
+        self.assertEqual(text_node_to_html_node(node, "/site/").props["src"], "/site/images/a.png")
+
     def test_link_missing_url(self):
         node = TextNode("Broken link!", TextType.LINK)
         with self.assertRaises(ValueError) as context:
@@ -175,6 +200,26 @@ class TestTextNode(unittest.TestCase):
 
         self.assertListEqual(result, expected)
 
+    def test_underscore_inside_code_and_url(self):
+        text = "Call `snake_case()` or see [docs](https://example.com/a_b) _now_"
+        result = text_to_textnodes(text)
+
+        expected = [
+            TextNode("Call ", TextType.TEXT),
+            TextNode("snake_case()", TextType.CODE),
+            TextNode(" or see ", TextType.TEXT),
+            TextNode("docs", TextType.LINK, "https://example.com/a_b"),
+            TextNode(" ", TextType.TEXT),
+            TextNode("now", TextType.ITALIC),
+        ]
+
+        self.assertListEqual(result, expected)
+
+    def test_unclosed_delimiter(self):
+        for text in ("This is **bold", "An _italic", "Some `code", "**a** and **b"):
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
     def test_empty_text(self):
         text = ""
         result = text_to_textnodes(text)